@@ -1,8 +1,18 @@
 import unconstrained.minizinc as mz
 
-async def solve(n:int, options: mz.SolveOptions, **kwargs):
+# The rotations and reflections of the board
+symmetries = mz.permutation_symmetries("q")
+
+async def solve(
+    n:int,
+    options: mz.SolveOptions,
+    variable_choice=mz.FIRST_FAIL,
+    constrain_choice=mz.INDOMAIN_MIN,
+    **kwargs
+):
     """
     Solve the model with the given options
+    and search strategy
     """
 
     mzn = f"""
@@ -29,7 +39,7 @@ async def solve(n:int, options: mz.SolveOptions, **kwargs):
         alldifferent([ q[i] - i | i in N]); 
     
     solve ::
-        int_search(q, first_fail, indomain_min)
+        {mz.int_search("q", variable_choice, constrain_choice)}
         satisfy;
     """
 
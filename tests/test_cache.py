@@ -0,0 +1,86 @@
+"""
+Tests for the caches
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unconstrained.minizinc.cache import DiskCache, FlatZincCache, ResultCache, InterfaceCache, hash_key
+
+
+def write(path, text):
+    path.write_text(text)
+    return path
+
+
+def test_hash_key_is_stable():
+    assert hash_key("a", 1) == hash_key("a", 1)
+    assert hash_key("a", 1) != hash_key("a", 2)
+    assert hash_key("ab", "c") != hash_key("a", "bc")
+
+
+def test_cache_hits_and_misses(tmp_path):
+    cache = FlatZincCache(tmp_path / "cache")
+    fzn = write(tmp_path / "model.fzn", "solve satisfy;")
+    ozn = write(tmp_path / "model.ozn", "output [];")
+
+    assert cache.get("key") is None
+    cache.put("key", [fzn, ozn])
+    files = cache.get("key")
+
+    assert files is not None
+    assert [f.read_text() for f in files] == ["solve satisfy;", "output [];"]
+    assert cache.hits == 1
+    assert cache.misses == 1
+    assert "key" in cache
+    assert len(cache) == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path / "cache", max_bytes=25)
+    source = write(tmp_path / "source", "x" * 10)
+
+    cache.put("a", [source])
+    cache.put("b", [source])
+    os.utime(cache.files("a")[0], (0, 0))
+    os.utime(cache.files("b")[0], (1, 1))
+    cache.get("a")
+    cache.put("c", [source])
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.size <= 25
+
+
+def test_result_cache_expires_old_entries(tmp_path):
+    cache = ResultCache(tmp_path, max_age=dict(hours=1))
+    cache.write("fresh", "{}")
+    cache.write("stale", "{}")
+    os.utime(cache.files("stale")[0], (0, 0))
+
+    assert cache.read("fresh") == "{}"
+    assert cache.read("stale") is None
+    assert "stale" not in cache
+
+
+def test_concurrent_writes_of_the_same_key(tmp_path):
+    cache = ResultCache(tmp_path)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: cache.write("key", str(i)), range(200)))
+
+    assert int(cache.read("key")) in range(200)
+    assert [f.name for f in tmp_path.iterdir() if f.name.startswith(".")] == []
+
+
+def test_interface_cache_evicts_least_recently_used():
+    cache = InterfaceCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
@@ -0,0 +1,49 @@
+"""
+Tests for bulk data files
+"""
+
+import json
+from pytest import importorskip
+from unconstrained.minizinc.data import write_data_file, temporary_data_file, is_bulk
+import unconstrained.minizinc.data as data
+
+
+def test_write_data_file(tmp_path):
+    path = write_data_file(tmp_path / "data.json", dict(n=3, x=[1, 2], s={1, 2}, b=True))
+    assert json.loads(path.read_text()) == dict(n=3, x=[1, 2], s={"set": [1, 2]}, b=True)
+
+
+def test_long_lists_are_written_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(data, "CHUNK", 4)
+    path = write_data_file(tmp_path / "data.json", dict(x=list(range(10))))
+    assert json.loads(path.read_text()) == dict(x=list(range(10)))
+
+
+def test_numpy_arrays(tmp_path, monkeypatch):
+    np = importorskip("numpy")
+    monkeypatch.setattr(data, "CHUNK", 4)
+    values = dict(
+        x=np.arange(10),
+        y=np.arange(12).reshape(3, 4),
+        b=np.array([True, False]),
+        n=np.int64(3),
+    )
+    path = write_data_file(tmp_path / "data.json", values)
+
+    assert is_bulk(values)
+    assert json.loads(path.read_text()) == dict(
+        x=list(range(10)),
+        y=[[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11]],
+        b=[True, False],
+        n=3,
+    )
+
+
+def test_temporary_data_file_is_deleted_when_closed():
+    from pathlib import Path
+
+    file = temporary_data_file(dict(n=1))
+    path = Path(file.name)
+    assert path.read_text() == '{"n":1}'
+    file.close()
+    assert not path.exists()
@@ -0,0 +1,79 @@
+"""
+Tests for the debug artifact writer
+"""
+
+import os
+from unconstrained.minizinc.debug import DebugWriter, get_debug_writer
+
+
+def test_debug_writer_writes_model_and_data(tmp_path):
+    writer = DebugWriter(tmp_path)
+    model_file, data_file = writer.write("my model", "a1", "int: n;", dict(n=3))
+    writer.flush()
+
+    assert model_file.read_text() == "int: n;"
+    assert data_file is not None
+    assert data_file.read_text() == '{"n": 3}'
+
+
+def test_debug_writer_retention(tmp_path):
+    writer = DebugWriter(tmp_path, max_files=3)
+    for i in range(5):
+        writer.write("model", str(i), "var bool: b;")
+    writer.flush()
+
+    assert sorted(f.name for f in tmp_path.iterdir()) == [
+        "model_2.mzn",
+        "model_3.mzn",
+        "model_4.mzn",
+    ]
+
+
+def test_debug_writer_retention_counts_earlier_runs(tmp_path):
+    for i in range(3):
+        old = tmp_path / f"old_{i}.mzn"
+        old.write_text("var bool: b;")
+        os.utime(old, (i, i))
+    (tmp_path / "notes.txt").write_text("kept")
+
+    writer = DebugWriter(tmp_path, max_files=3)
+    for i in range(2):
+        writer.write("model", str(i), "var bool: b;")
+    writer.flush()
+
+    assert sorted(f.name for f in tmp_path.iterdir()) == [
+        "model_0.mzn",
+        "model_1.mzn",
+        "notes.txt",
+        "old_2.mzn",
+    ]
+
+
+def test_debug_writer_keeps_the_newest_artifacts(tmp_path):
+    writer = DebugWriter(tmp_path, max_bytes=10)
+    writer.write("model", "0", "var bool: b;")
+    model_file, data_file = writer.write("model", "1", "array[1..3] of var bool: b;", dict(n=3))
+    writer.flush()
+
+    assert model_file.exists()
+    assert data_file is not None and data_file.exists()
+    assert sorted(f.name for f in tmp_path.iterdir()) == ["model_1.json", "model_1.mzn"]
+
+
+def test_debug_writer_prunes_model_and_data_together(tmp_path):
+    old = tmp_path / "old_0.mzn"
+    old.write_text("int: n;")
+    (tmp_path / "old_0.json").write_text('{"n": 3}')
+    for file in tmp_path.iterdir():
+        os.utime(file, (0, 0))
+
+    writer = DebugWriter(tmp_path, max_files=3)
+    for i in range(3):
+        writer.write("model", str(i), "int: n;", dict(n=i))
+    writer.flush()
+
+    assert sorted(f.name for f in tmp_path.iterdir()) == ["model_2.json", "model_2.mzn"]
+
+
+def test_debug_writer_is_shared_per_directory(tmp_path):
+    assert get_debug_writer(tmp_path) is get_debug_writer(str(tmp_path))
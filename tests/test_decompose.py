@@ -0,0 +1,77 @@
+"""
+Tests for solving independent sub-problems
+"""
+
+from unconstrained import minizinc as mz
+from unconstrained.minizinc.decompose import merge_statistics
+
+
+def part(objective, bound, status=mz.OPTIMAL, **statistics):
+    return mz.SolveResult(
+        method=mz.MINIMIZE,
+        status=status,
+        objective=objective,
+        objective_bound=bound,
+        statistics=statistics,
+        variables=dict(x=objective),
+    )
+
+
+def test_merge_statistics():
+    merged = merge_statistics([dict(nodes=10, peakDepth=3, method="min"), dict(nodes=5, peakDepth=7)])
+    assert merged.to_dict() == dict(nodes=15, peakDepth=7, method="min")
+
+
+def test_merge_results():
+    result = mz.merge_results({"ward 1": part(10, 8, mz.FEASIBLE, nodes=1), "ward 2": part(5, 5, nodes=2)})
+
+    assert result.status == mz.FEASIBLE
+    assert result.objective == 15
+    assert result.objective_bound == 13
+    assert result.absolute_gap == 2
+    assert result.statistics["nodes"] == 3
+    assert result["ward 1"]["x"] == 10
+
+
+def test_merge_results_is_optimal_only_if_every_part_is():
+    assert mz.merge_results([part(1, 1), part(2, 2)]).status == mz.OPTIMAL
+    assert mz.merge_results([part(1, 1), part(2, 2, mz.UNSATISFIABLE)]).status == mz.UNSATISFIABLE
+
+
+def test_merge_results_status_of_unbounded_and_enumerated_parts():
+    assert mz.merge_results([part(1, 1), part(2, 2, mz.UNBOUNDED)]).status == mz.UNBOUNDED
+    assert mz.merge_results([part(1, 1, mz.ALL_SOLUTIONS), part(2, 2, mz.ALL_SOLUTIONS)]).status == mz.ALL_SOLUTIONS
+    assert mz.merge_results([part(1, 1, mz.ALL_SOLUTIONS), part(2, 2, mz.TIMEOUT)]).status == mz.TIMEOUT
+
+
+def test_merge_results_relative_gap_matches_solve():
+    from unconstrained.minizinc.minizinc import objective_gaps
+
+    result = mz.merge_results([part(-8, -10, mz.FEASIBLE)])
+    assert result.relative_gap == objective_gaps(-8, -10)[3] == 0.2
+
+
+async def test_solve_decomposed(minizinc_options):
+    model = """
+        int: n;
+        var 0..n: a;
+        solve maximize a;
+        """
+    parts = {week: (model, dict(n=week), minizinc_options) for week in range(1, 4)}
+    result = await mz.solve_decomposed(parts)
+
+    assert result.status == mz.OPTIMAL
+    assert result.objective == 6
+    assert result["2"]["a"] == 2
+
+
+async def test_solve_decomposed_in_processes(minizinc_options):
+    model = """
+        int: n;
+        var 0..n: a;
+        solve maximize a;
+        """
+    parts = [(model, dict(n=n), minizinc_options) for n in range(1, 4)]
+    result = await mz.solve_decomposed(parts, processes=2)
+
+    assert result.objective == 6
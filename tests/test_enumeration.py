@@ -0,0 +1,102 @@
+"""
+Tests for streaming enumeration
+"""
+
+from itertools import permutations
+from unconstrained import minizinc as mz
+from unconstrained.minizinc.enumeration import open_solutions, solution_variables
+from unconstrained.minizinc.data import encode
+from models import nqueens
+
+model = """
+include "alldifferent.mzn";
+int: n;
+array [1..n] of var 1..n: q;
+constraint alldifferent(q);
+constraint alldifferent([q[i] + i | i in 1..n]);
+constraint alldifferent([q[i] - i | i in 1..n]);
+"""
+
+
+def queens(n):
+    for q in permutations(range(1, n + 1)):
+        if len({r + i for i, r in enumerate(q)}) == n and len({r - i for i, r in enumerate(q)}) == n:
+            yield dict(q=list(q))
+
+
+def test_board_symmetries_are_distinct():
+    solution = dict(q=[1, 5, 8, 6, 3, 7, 2, 4])
+    images = [symmetry(solution)["q"] for symmetry in nqueens.symmetries]
+    assert len({tuple(image) for image in images + [solution["q"]]}) == 8
+
+
+def test_unique_solutions():
+    assert len(list(mz.unique_solutions(queens(4), nqueens.symmetries))) == 1
+    assert len(list(mz.unique_solutions(queens(8), nqueens.symmetries))) == 12
+
+
+def test_symmetry_index():
+    index = mz.SymmetryIndex(nqueens.symmetries)
+    assert index.add(dict(q=[2, 4, 1, 3])) == dict(q=[2, 4, 1, 3])
+    assert index.add(dict(q=[3, 1, 4, 2])) is None
+    assert dict(q=[3, 1, 4, 2]) in index
+    assert len(index) == 1
+
+
+def test_symmetry_index_of_set_solutions():
+    def mirror(solution):
+        return solution | dict(s=frozenset(4 - x for x in solution["s"]))
+
+    index = mz.SymmetryIndex([mirror])
+    assert index.add(dict(s=frozenset({1, 2}))) is not None
+    assert index.add(dict(s=frozenset({2, 3}))) is None
+    assert index.add(dict(s=frozenset({1, 3}))) is not None
+    assert len(index) == 2
+
+
+def test_read_solutions_compressed(tmp_path):
+    path = tmp_path / "solutions.ndjson.gz"
+    with open_solutions(path, "w") as file:
+        file.write('{"q":[2,4,1,3]}\n{"q":[3,1,4,2]}\n')
+
+    assert list(mz.read_solutions(path)) == [dict(q=[2, 4, 1, 3]), dict(q=[3, 1, 4, 2])]
+
+
+def test_solution_variables_can_be_encoded():
+    result = mz.SolveResult(variables=mz.snapshot({}, dict(s={1, 2}, q=[[1, 2], [3, 4]], _hidden=1)))
+    assert encode(solution_variables(result)) == '{"s":{"set":[1,2]},"q":[[1,2],[3,4]]}'
+
+
+async def test_stream_set_solutions(minizinc_options, tmp_path):
+    enumeration = await mz.stream_solutions(
+        "var set of 1..3: s; constraint card(s) == 2;", minizinc_options, tmp_path / "sets.ndjson"
+    )
+    assert enumeration.count == 3
+    assert sorted(sorted(s["s"]["set"]) for s in mz.read_solutions(enumeration.path)) == [[1, 2], [1, 3], [2, 3]]
+
+
+async def test_stream_solutions(minizinc_options, tmp_path):
+    enumeration = await mz.stream_solutions(
+        model, minizinc_options, tmp_path / "queens.ndjson", parameters=dict(n=6)
+    )
+    assert enumeration.result.status == mz.ALL_SOLUTIONS
+    assert enumeration.count == 4
+    assert len(list(mz.read_solutions(enumeration.path))) == 4
+
+
+async def test_count_solutions(minizinc_options):
+    enumeration = await mz.stream_solutions(model, minizinc_options, parameters=dict(n=8))
+    assert enumeration.count == 92
+    assert enumeration.path is None
+
+
+async def test_stream_unique_solutions(minizinc_options, tmp_path):
+    enumeration = await mz.stream_solutions(
+        model,
+        minizinc_options,
+        tmp_path / "queens.ndjson",
+        symmetries=nqueens.symmetries,
+        parameters=dict(n=8),
+    )
+    assert enumeration.count == 92
+    assert enumeration.unique == 12
@@ -0,0 +1,61 @@
+"""
+Tests for choosing the flatten level from history
+"""
+
+from unconstrained import minizinc as mz
+from unconstrained.minizinc.flattening import run_cost
+
+
+def test_run_cost():
+    assert run_cost(3.0, True, 10) == 3.0
+    assert run_cost(3.0, False, 10, 0.5) == 30.0
+    assert run_cost(3.0, False, 10) == 40.0
+
+
+def test_every_level_is_tried_first():
+    history = mz.FlattenHistory(levels=[mz.FLATTEN_SINGLE_PASS, mz.FLATTEN_TWO_PASS], epsilon=0)
+    first = history.choose("model")
+    history.record("model", first, 0.1, 1.0, 1.1)
+    second = history.choose("model")
+    assert {first, second} == {1, 2}
+
+
+def test_cheapest_level_is_exploited():
+    history = mz.FlattenHistory(levels=[1, 2, 3], epsilon=0)
+    history.record("model", mz.FLATTEN_SINGLE_PASS, 0.1, 5.0, 5.1)
+    history.record("model", mz.FLATTEN_TWO_PASS, 0.5, 1.0, 1.5)
+    history.record("model", mz.FLATTEN_USE_GECODE, 2.0, 1.0, 3.0)
+    assert history.best("model") == 2
+    assert all(history.choose("model") == 2 for _ in range(10))
+    assert history.choose("other") == 1
+
+
+def test_exploration():
+    history = mz.FlattenHistory(levels=[1, 2], epsilon=1, seed=1)
+    history.record("model", 1, 0.1, 1.0, 1.1)
+    history.record("model", 2, 0.1, 9.0, 9.1)
+    assert {history.choose("model") for _ in range(50)} == {1, 2}
+
+
+def test_history_is_persisted(tmp_path):
+    path = tmp_path / "flattening.json"
+    history = mz.FlattenHistory(path)
+    history.record("model", 2, 0.5, 1.0, 1.5)
+    history.record("model", 2, 0.5, 2.0, 2.5)
+
+    loaded = mz.FlattenHistory(path)
+    assert "model" in loaded
+    assert loaded.runs("model", mz.FLATTEN_TWO_PASS) == dict(runs=2, cost=4.0, flatten=1.0, solve=3.0)
+    assert loaded.mean_cost("model", 2) == 2.0
+
+
+def test_concurrent_histories_share_a_file(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    path = tmp_path / "flattening.json"
+    histories = [mz.FlattenHistory(path), mz.FlattenHistory(path)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: histories[i % 2].record("model", 1, 0.1, 1.0, 1.1), range(100)))
+
+    assert mz.FlattenHistory(path).runs("model", 1)["runs"] in (50, 100)
+    assert [f.name for f in tmp_path.iterdir()] == ["flattening.json"]
@@ -0,0 +1,97 @@
+"""
+Tests for Large Neighbourhood Search
+"""
+
+import random
+import importlib
+from unconstrained import minizinc as mz
+from unconstrained.minizinc.lns import (
+    block_neighbourhood,
+    neighbourhood_model,
+    random_neighbourhood,
+)
+
+
+def best():
+    return mz.SolveResult(
+        method=mz.MAXIMIZE,
+        objective=3,
+        variables=dict(x=[1, 0, 1, 1, 0], b=True, _output_item=""),
+    )
+
+
+def test_random_neighbourhood_fixes_a_fraction():
+    fixed = random_neighbourhood(fix_rate=0.6)(best(), random.Random(1))
+    assert sorted(fixed) == ["x"]
+    assert len(fixed["x"]) == 3
+    assert len(set(fixed["x"])) == 3
+
+
+def test_random_neighbourhood_frees_a_position():
+    result = mz.SolveResult(variables=dict(x=[1, 0], y=[1], cost=3))
+    fixed = random_neighbourhood()(result, random.Random(1))
+    assert {name: len(positions) for name, positions in fixed.items()} == dict(x=1, y=0)
+
+
+def test_block_neighbourhood_frees_a_block():
+    fixed = block_neighbourhood(["x"], free_rate=0.4)(best(), random.Random(1))
+    free = sorted(set(range(5)) - set(fixed["x"]))
+    assert len(free) == 2
+    assert free[1] - free[0] == 1
+
+
+def test_neighbourhood_model():
+    model = neighbourhood_model("var bool: b;", best(), dict(x=[0, 4], b=[0]))
+    assert model.splitlines() == [
+        "var bool: b;",
+        "constraint array1d(x)[1] = 1 /\\ array1d(x)[5] = 0;",
+        "constraint b = true;",
+    ]
+
+
+async def test_lns_stops_when_nothing_can_improve():
+    proven = mz.SolveResult(method=mz.MAXIMIZE, status=mz.OPTIMAL, objective=3)
+    satisfied = mz.SolveResult(method=mz.SATISFY, status=mz.FEASIBLE)
+    for initial in (proven, satisfied):
+        assert [r async for r in mz.lns("", mz.SolveOptions(), initial=initial)] == []
+
+
+async def test_lns_stops_after_repeated_failures(monkeypatch):
+    calls = []
+
+    async def solution(model, options, **kwargs):
+        calls.append(model)
+        raise RuntimeError("solver crashed")
+
+    monkeypatch.setattr(importlib.import_module("unconstrained.minizinc.lns"), "solution", solution)
+    results = [r async for r in mz.lns("", mz.SolveOptions(), initial=best(), parallel=2, max_failures=3)]
+
+    assert results == []
+    assert len(calls) == 6
+
+
+async def test_lns_improves_solution(minizinc_options):
+    model = """
+        array[1..10] of var 0..9: x;
+        constraint alldifferent(x);
+        include "alldifferent.mzn";
+        solve maximize sum(i in 1..10)(i * x[i]);
+        """
+    options = mz.SolveOptions(time_limit=dict(seconds=1))
+    initial = await mz.solution(model, options, stop=mz.NoImprovement(solutions=1))
+    results = [
+        r
+        async for r in mz.lns(
+            model,
+            options,
+            initial=initial,
+            time_limit=dict(seconds=3),
+            neighbourhood_time_limit=dict(milliseconds=500),
+            parallel=2,
+            seed=1,
+        )
+    ]
+
+    assert results
+    assert all(r.status == mz.FEASIBLE for r in results)
+    assert all(r.objective > initial.objective for r in results)
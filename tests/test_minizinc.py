@@ -3,7 +3,7 @@ Tests for the minizinc api
 """
 
 from unconstrained import minizinc as mz
-from pytest import mark, fixture, raises
+from pytest import mark, fixture, raises, importorskip
 
 
 @fixture
@@ -123,3 +123,577 @@ def test_get_available_solvers():
 @mark.parametrize('tag', [mz.ORTOOLS, mz.CHUFFED, mz.COINBC, mz.GECODE])
 def test_solver_is_available(tag):
     assert mz.Solver.lookup(tag)
+
+
+async def test_race_returns_proven_result(minizinc_options):
+    result = await mz.race(
+        """
+        var 1..10: a;
+        var 1..10: b;
+        constraint a < b;
+        solve maximize (b - a);
+        """,
+        minizinc_options,
+        solvers=[mz.GECODE, mz.CHUFFED, mz.ORTOOLS],
+        name='test race'
+        )
+    assert result.status == mz.OPTIMAL, result.error
+    assert result.objective == 9
+    assert result.solver_id in [mz.GECODE, mz.CHUFFED, mz.ORTOOLS]
+
+
+@mark.filterwarnings("ignore:model inconsistency")
+async def test_race_unsatisfiable(minizinc_options):
+    result = await mz.race(
+        """
+        var 1..1: a;
+        var 2..2: b;
+        constraint b < a;
+        """,
+        minizinc_options,
+        solvers=[mz.GECODE, mz.CHUFFED],
+        name='test race unsat'
+        )
+    assert result.status == mz.UNSATISFIABLE
+
+
+async def test_solve_many(minizinc_options):
+    jobs = {
+        n: ("int: n; var 1..n: a; solve maximize a;", dict(n=n), minizinc_options)
+        for n in range(1, 6)
+    }
+    results = {}
+    async for key, result in mz.solve_many(jobs, concurrency=2):
+        results[key] = result
+
+    assert set(results) == set(jobs)
+    for n, result in results.items():
+        assert result.status == mz.OPTIMAL, result.error
+        assert result['a'] == n
+
+
+async def test_solve_with_flatzinc_cache(minizinc_options, tmp_path):
+    cache = mz.FlatZincCache(tmp_path)
+    model = """
+        var 1..10: a;
+        var 1..10: b;
+        constraint a < b;
+        solve maximize (b - a);
+        """
+
+    first = await mz.solution(model, minizinc_options, flatzinc_cache=cache)
+    second = await mz.solution(model, minizinc_options, flatzinc_cache=cache)
+
+    assert cache.misses == 1
+    assert cache.hits == 1
+    assert first.objective == second.objective == 9
+    assert second['b'] == 10
+
+
+async def test_solve_reuses_model_interface(minizinc_options):
+    cache = mz.InterfaceCache()
+    model = """
+        int: n;
+        var 1..n: a;
+        solve maximize a;
+        """
+
+    first = await mz.solution(model, minizinc_options, parameters=dict(n=3), interface_cache=cache)
+    second = await mz.solution(model, minizinc_options, parameters=dict(n=5), interface_cache=cache)
+
+    assert cache.misses == 1
+    assert cache.hits == 1
+    assert first['a'] == 3
+    assert second['a'] == 5
+
+
+async def test_solve_records_telemetry(minizinc_options):
+    telemetry = mz.Telemetry()
+    events = []
+    telemetry.subscribe(lambda event, fields: events.append(event))
+    model = """
+        var 1..10: a;
+        solve maximize a;
+        """
+
+    await mz.solution(model, minizinc_options, telemetry=telemetry)
+
+    summary = telemetry.summary()
+    assert summary["counters"]["solves"] == 1
+    assert summary["counters"]["status.OPTIMAL"] == 1
+    assert summary["counters"]["solutions"] == 1
+    assert summary["histograms"]["solve_time"]["count"] == 1
+    assert events[-1] == "result"
+
+
+async def test_solve_records_telemetry_of_intermediate_solutions(minizinc_options):
+    telemetry = mz.Telemetry()
+    model = """
+        var 1..10: a;
+        solve maximize a;
+        """
+
+    results = [
+        r async for r in mz.solve(model, minizinc_options, telemetry=telemetry, intermediate_solutions=True)
+    ]
+
+    summary = telemetry.summary()
+    assert summary["counters"]["solves"] == 1
+    assert summary["counters"]["status.OPTIMAL"] == 1
+    assert summary["counters"]["solutions"] == len(results) - 1
+
+
+async def test_solve_reports_phase_timings(minizinc_options):
+    model = """
+        var 1..10: a;
+        solve maximize a;
+        """
+    results = [r async for r in mz.solve(model, minizinc_options)]
+    first, last = results[0], results[-1]
+
+    assert first.timings.assembly.total_seconds() > 0
+    assert first.solution_timings.assembly.total_seconds() == 0
+    assert last.timings.search == sum((r.solution_timings.search for r in results), mz.Timings().search)
+    assert last.timings.total >= first.timings.total
+    assert last.timings.total.total_seconds() <= last.solve_time.total_seconds() + 1
+
+
+async def test_solve_records_convergence_trace(minizinc_options):
+    trace = mz.ConvergenceTrace("gecode")
+    model = """
+        var 1..10: a;
+        solve maximize a;
+        """
+    results = [r async for r in mz.solve(model, minizinc_options, trace=trace)]
+
+    assert len(trace) == len(results)
+    assert trace.column("objective")[-1] == 10
+
+
+async def test_solve_stops_at_objective_target(minizinc_options):
+    options = mz.SolveOptions(free_search=False, stop_objective=10)
+    model = """
+        array[1..20] of var 0..1: x;
+        solve :: int_search(x, input_order, indomain_min) maximize sum(i in 1..20)(i * x[i]);
+        """
+    results = [r async for r in mz.solve(model, options)]
+    last = results[-1]
+
+    assert last.status == mz.THRESHOLD
+    assert last.objective >= 10
+    assert last.objective < 210
+
+
+async def test_solve_timeout_keeps_best_objective():
+    options = mz.SolveOptions(free_search=False, time_limit=dict(seconds=1))
+    model = """
+        include "globals.mzn";
+        int: n = 14;
+        array[1..n] of var 0..n * n: mark;
+        constraint mark[1] = 0;
+        constraint forall(i in 1..n - 1)(mark[i] < mark[i + 1]);
+        constraint all_different([mark[j] - mark[i] | i in 1..n, j in i + 1..n]);
+        solve :: int_search(mark, input_order, indomain_min) minimize mark[n];
+        """
+    results = [r async for r in mz.solve(model, options, intermediate_solutions=True)]
+    best, last = results[-2], results[-1]
+
+    assert last.status in (mz.TIMEOUT, mz.UNKNOWN)
+    assert last.objective == best.objective
+    assert last.objective_bound == best.objective_bound
+    assert last.relative_gap == best.relative_gap
+
+
+async def test_solve_many_with_scheduler(minizinc_options):
+    scheduler = mz.CoreScheduler(cores=2)
+    model = """
+        int: n;
+        var 0..n: a;
+        solve maximize a;
+        """
+    jobs = {n: (model, dict(n=n), minizinc_options) for n in range(1, 5)}
+    results = {k: r async for k, r in mz.solve_many(jobs, scheduler=scheduler)}
+
+    assert {k: r['a'] for k, r in results.items()} == {n: n for n in range(1, 5)}
+    assert scheduler.used == 0
+
+
+async def test_solve_with_bulk_numpy_data(minizinc_options):
+    np = importorskip("numpy")
+    model = """
+        int: n;
+        array[1..n] of int: w;
+        var 1..n: i;
+        solve maximize w[i];
+        """
+    w = np.array([3, 9, 4])
+    result = await mz.solution(model, minizinc_options, parameters=dict(n=3, w=w))
+
+    assert result['i'] == 2
+    assert result.objective == 9
+
+
+async def test_solve_with_bulk_data_and_debug(minizinc_options, tmp_path):
+    np = importorskip("numpy")
+    model = """
+        int: n;
+        array[1..n] of int: w;
+        var 1..n: i;
+        solve maximize w[i];
+        """
+    minizinc_options.debug_mode = mz.DEBUG_ASYNC
+    result = await mz.solution(
+        model, minizinc_options, parameters=dict(n=3, w=np.array([3, 9, 4])), debug_path=tmp_path
+    )
+
+    assert result.objective == 9
+    assert result.data_file.endswith(".json")
+
+
+async def test_solve_with_search(minizinc_options):
+    model = """
+        array[1..5] of var 1..10: x;
+        constraint forall(i in 1..4)(x[i] < x[i+1]);
+        solve :: int_search(x, input_order, indomain_min) maximize sum(x);
+        """
+    minizinc_options.variable_choice = mz.FIRST_FAIL
+    minizinc_options.constrain_choice = mz.INDOMAIN_MED
+    chosen = await mz.solution(model, minizinc_options)
+    replaced = await mz.solution(model, minizinc_options, search=mz.int_search("x", mz.SMALLEST, mz.INDOMAIN_SPLIT))
+    assert chosen.objective == replaced.objective == 40
+
+
+async def test_solve_with_flatten_history(minizinc_options, tmp_path):
+    model = "int: n; var 1..n: x; solve maximize x;"
+    history = mz.FlattenHistory(tmp_path / "flattening.json", levels=[mz.FLATTEN_SINGLE_PASS, mz.FLATTEN_TWO_PASS])
+    for n in range(3):
+        result = await mz.solution(model, minizinc_options, parameters=dict(n=10 + n), flatten_history=history)
+        assert result.objective == 10 + n
+
+    assert len(history) == 1
+    [levels] = history.entries.values()
+    assert sum(runs["runs"] for runs in levels.values()) == 3
+    assert mz.FlattenHistory(tmp_path / "flattening.json").entries == history.entries
+
+
+def test_timings_add_up():
+    a = mz.Timings(assembly=dict(seconds=1), search=dict(seconds=2))
+    b = mz.Timings(search=dict(seconds=3), extraction=dict(seconds=1))
+    total = a + b
+    assert total.search.total_seconds() == 5
+    assert total.total.total_seconds() == 7
+
+
+def test_solve_result_json_roundtrip():
+    result = mz.SolveResult(
+        status=mz.OPTIMAL,
+        method=mz.MAXIMIZE,
+        objective=9,
+        flatten_time=dict(seconds=2),
+        variables=dict(a=1, b=[1, 2]),
+    )
+    copy = mz.SolveResult.from_json_string(result.to_json_string())
+    assert copy == result
+
+
+async def test_solution_result_cache(minizinc_options, tmp_path):
+    cache = mz.ResultCache(tmp_path)
+    model = "var 1..10: a; solve maximize a;"
+
+    first = await mz.solution(model, minizinc_options, result_cache=cache)
+    second = await mz.solution(model, minizinc_options, result_cache=cache)
+
+    assert first.status == mz.OPTIMAL
+    assert cache.hits == 1
+    assert second.id == first.id
+    assert second['a'] == 10
+    assert type(second.variables) is type(first.variables)
+
+
+def test_result_key_covers_solve_options():
+    from attrs import evolve
+    from unconstrained.minizinc.minizinc import result_key
+
+    options = mz.SolveOptions()
+    key = result_key("var 1..3: a;", options, "solution")
+
+    assert result_key("var 1..3: a;", evolve(options, variable_choice=mz.FIRST_FAIL), "solution") != key
+    assert result_key("var 1..3: a;", evolve(options, constrain_choice=mz.INDOMAIN_SPLIT), "solution") != key
+    assert result_key("var 1..3: a;", options, "solution", search=["int_search(a, first_fail, indomain_min)"]) != key
+    assert result_key("var 1..3: a;", evolve(options, time_limit=dict(seconds=5)), "solution") == key
+    assert result_key("var 1..3: a;", evolve(options, debug_mode=mz.DEBUG_ASYNC), "solution") == key
+
+
+def test_result_key_of_enum_parameters():
+    from enum import Enum
+    from unconstrained.minizinc.minizinc import result_key
+
+    Colour = Enum("Colour", ["RED", "GREEN"])
+    Shade = Enum("Colour", ["RED", "BLUE"])
+    options = mz.SolveOptions()
+
+    key = result_key("enum Colour; var Colour: c;", options, "solution", parameters=dict(Colour=Colour))
+    assert key == result_key("enum Colour; var Colour: c;", options, "solution", parameters=dict(Colour=Colour))
+    assert key != result_key("enum Colour; var Colour: c;", options, "solution", parameters=dict(Colour=Shade))
+
+
+async def test_solution_result_cache_with_enum_parameter(minizinc_options, tmp_path):
+    from enum import Enum
+
+    Colour = Enum("Colour", ["RED", "GREEN", "BLUE"])
+    cache = mz.ResultCache(tmp_path)
+    model = "enum Colour; var Colour: c; solve maximize c;"
+
+    first = await mz.solution(model, minizinc_options, parameters=dict(Colour=Colour), result_cache=cache)
+    second = await mz.solution(model, minizinc_options, parameters=dict(Colour=Colour), result_cache=cache)
+
+    assert first.status == mz.OPTIMAL
+    assert cache.hits == 1
+    assert second.id == first.id
+
+
+def test_cached_result_variables_match_fresh_ones():
+    import json
+    from unconstrained.minizinc.minizinc import to_cached, from_cached
+
+    variables = mz.snapshot({}, dict(q=[[1, 2], [3, 4]], s={1, 2}, n=3))
+    result = mz.SolveResult(status=mz.OPTIMAL, variables=variables)
+    cached = from_cached(json.loads(json.dumps(to_cached(result))))
+
+    assert type(cached.variables) is type(variables)
+    assert dict(cached.variables) == dict(variables)
+    assert cached['q'] == ((1, 2), (3, 4))
+    assert cached['s'] == frozenset({1, 2})
+
+
+def test_snapshot_shares_unchanged_values():
+    first = mz.snapshot({}, dict(a=[[1, 2], [3, 4]], b=[1, 2, 3], c=1))
+    second = mz.snapshot(first, dict(a=[[1, 2], [3, 4]], b=[1, 2, 4], c=1))
+
+    assert second['a'] is first['a']
+    assert second['b'] == (1, 2, 4)
+    assert first['b'] == (1, 2, 3)
+    with raises(TypeError):
+        second['c'] = 2  # type:ignore
+
+
+def large_outputs(n: int = 50_000):
+    values = dict(x=list(range(n)), y=[[i % 7 for i in range(100)] for _ in range(n // 100)])
+    return values, values | dict(x=list(range(1, n + 1)))
+
+
+def test_snapshot_of_large_outputs_is_immutable_and_shared():
+    values, changed = large_outputs()
+    previous = mz.snapshot({}, values)
+    current = mz.snapshot(previous, changed)
+
+    assert current['y'] is previous['y']
+    assert current['x'] is not previous['x']
+    assert previous['x'][0] == 0
+    with raises(TypeError):
+        current['x'] = []  # type:ignore
+    with raises(TypeError):
+        current['y'][0][0] = 1  # type:ignore
+
+
+@mark.benchmark
+def test_snapshot_benchmark():
+    """
+    Compare the per-solution cost of snapshotting a large
+    output array against the previous deepcopy approach
+    """
+    from copy import deepcopy
+    from timeit import timeit
+
+    values, changed = large_outputs()
+    previous = mz.snapshot({}, values)
+
+    def copy_all():
+        variables = deepcopy(dict(previous))
+        for key, value in changed.items():
+            variables[key] = value
+
+    copy_time = timeit(copy_all, number=5) / 5
+    snapshot_time = timeit(lambda: mz.snapshot(previous, changed), number=5) / 5
+
+    assert snapshot_time * 2 < copy_time
+
+
+async def test_solve_writes_debug_artifacts(minizinc_options, tmp_path):
+    minizinc_options.debug_mode = mz.DEBUG_ASYNC
+    result = await mz.solution(
+        "int: n; var 1..n: a; solve maximize a;",
+        minizinc_options,
+        parameters=dict(n=3),
+        debug_path=tmp_path,
+    )
+    assert result['a'] == 3
+    assert result.model_file.endswith(".mzn")
+    assert result.data_file.endswith(".json")
+
+
+def test_numpy_array_values():
+    np = importorskip("numpy")
+    grid = [[1, 2, 3], [4, 5, 6]]
+    result = mz.SolveResult(variables=mz.snapshot({}, dict(x=grid, n=2), arrays=True))
+
+    assert isinstance(result['x'], np.ndarray)
+    assert result['x', 1, 2] == 6
+    assert list(result.get_value('x', slice(None), 0)) == [1, 4]
+    assert list(result.get_value('x', 1, [0, 2])) == [4, 6]
+    assert result.array('x').sum() == 21
+    assert result['n'] == 2
+    assert not result['x'].flags.writeable
+
+
+def test_numpy_array_snapshot_shares_unchanged_arrays():
+    importorskip("numpy")
+    first = mz.snapshot({}, dict(x=[[1, 2], [3, 4]]), arrays=True)
+    second = mz.snapshot(first, dict(x=[[1, 2], [3, 4]]), arrays=True)
+    assert second['x'] is first['x']
+
+
+def test_array_accessor_on_list_values():
+    importorskip("numpy")
+    result = mz.SolveResult(variables=mz.snapshot({}, dict(xs=[[1, 2], [3, 4]])))
+    assert result.array('xs').shape == (2, 2)
+    assert result['xs', 1, 0] == 3
+
+
+async def test_coalesce_intermediate_solutions():
+    from types import SimpleNamespace
+    from minizinc import Result, Status
+
+    async def stream():
+        for objective in [100, 99, 98, 80, 79, 50]:
+            solution = SimpleNamespace(objective=objective)
+            yield Result(Status.SATISFIED, solution, dict(nodes=objective))
+        yield Result(Status.OPTIMAL_SOLUTION, None, {})
+
+    options = mz.SolveOptions(min_absolute_improvement=10)
+    results = [r async for r in mz.coalesce(stream(), options)]
+    objectives = [r.objective for r in results]
+
+    assert objectives == [100, 80, 50, None]
+    assert results[-1].status == Status.OPTIMAL_SOLUTION
+
+
+async def test_coalesce_delivers_last_dropped_solution():
+    from types import SimpleNamespace
+    from minizinc import Result, Status
+
+    async def stream():
+        for objective in [10, 9, 8]:
+            yield Result(Status.SATISFIED, SimpleNamespace(objective=objective), {})
+        yield Result(Status.SATISFIED, None, {})
+
+    options = mz.SolveOptions(min_interval=dict(hours=1))
+    objectives = [r.objective async for r in mz.coalesce(stream(), options)]
+    assert objectives == [10, 8, None]
+
+
+async def test_coalesce_flushes_solution_after_interval():
+    import asyncio
+    import time
+    from types import SimpleNamespace
+    from minizinc import Result, Status
+
+    async def stream():
+        for objective in [10, 9]:
+            yield Result(Status.SATISFIED, SimpleNamespace(objective=objective), {})
+        await asyncio.sleep(0.5)
+        yield Result(Status.SATISFIED, None, {})
+
+    start = time.monotonic()
+    options = mz.SolveOptions(min_interval=dict(milliseconds=50))
+    arrivals = [(r.objective, time.monotonic() - start) async for r in mz.coalesce(stream(), options)]
+
+    assert [objective for objective, _ in arrivals] == [10, 9, None]
+    assert arrivals[1][1] < 0.4
+
+
+async def test_stop_conditions_see_dropped_solutions():
+    from types import SimpleNamespace
+    from minizinc import Result, Status
+    from unconstrained.minizinc.minizinc import checked
+    from unconstrained.minizinc.stopping import Stopper, ObjectiveTarget
+
+    async def stream():
+        for objective in [10, 9, 8]:
+            yield Result(Status.SATISFIED, SimpleNamespace(objective=objective), {})
+
+    stopper = Stopper([ObjectiveTarget(9)])
+    options = mz.SolveOptions(min_interval=dict(hours=1))
+    objectives = [r.objective async for r in mz.coalesce(checked(stream(), stopper, mz.MINIMIZE), options)]
+
+    assert objectives == [10, 8]
+    assert stopper.stopped
+
+
+def test_warm_start_annotation():
+    from unconstrained.minizinc.builder import warm_start, annotate_solve
+
+    ann = warm_start(dict(q=((1, 3), (2, 4)), b=False, s=frozenset({1}), _output_item=""))
+    model = annotate_solve("array[1..2, 1..2] of var 1..4: q;\nsolve satisfy;", ann)
+
+    assert ann == "warm_start_array([warm_start(array1d(q), [1, 3, 2, 4]), warm_start([b], [false])])"
+    assert model.endswith(f"solve :: {ann} satisfy;")
+
+
+def test_search_annotations():
+    builder = mz.ModelBuilder()
+    builder.add_solve(
+        mz.seq_search(mz.int_search("x", mz.FIRST_FAIL, mz.INDOMAIN_SPLIT), mz.bool_search("b")),
+        mz.restart_luby(100),
+        minimize="cost",
+    )
+    assert str(builder) == (
+        "solve :: seq_search([int_search(x, first_fail, indomain_split), bool_search(b, input_order, indomain_min)])"
+        " :: restart_luby(100) minimize cost;\n"
+    )
+
+
+def test_replace_search():
+    model = "solve :: int_search(q, first_fail, indomain_min) :: restart_luby(10) :: warm_start_array([]) satisfy;"
+    swapped = mz.replace_search(model, mz.int_search("q", mz.DOM_W_DEG), mz.restart_geometric(1.5, 100))
+    assert swapped == (
+        "solve :: warm_start_array([]) :: int_search(q, dom_w_deg, indomain_min) :: restart_geometric(1.5, 100) satisfy;"
+    )
+
+
+def test_swap_search_choices():
+    from unconstrained.minizinc.builder import swap_search_choices
+
+    model = "solve :: seq_search([int_search([q[i] | i in N], first_fail, indomain_min), bool_search(b, input_order, indomain_max)]) minimize c;"
+    swapped = swap_search_choices(model, mz.DOM_W_DEG)
+    assert swapped == (
+        "solve :: seq_search([int_search([q[i] | i in N], dom_w_deg, indomain_min), bool_search(b, dom_w_deg, indomain_max)]) minimize c;"
+    )
+
+
+async def test_solve_with_warm_start(minizinc_options):
+    model = """
+        array[1..5] of var 1..10: x;
+        constraint forall(i in 1..4)(x[i] < x[i+1]);
+        solve maximize sum(x);
+        """
+    minizinc_options.solver_id = mz.ORTOOLS
+    first = await mz.solution(model, minizinc_options)
+    second = await mz.solution(model, minizinc_options, warm_start=first)
+    assert second.objective == first.objective == 40
+
+
+def test_solver_registry_is_persisted(tmp_path):
+    path = tmp_path / "solvers.json"
+    discovered = mz.SolverRegistry(path)
+    solver = discovered.lookup(mz.GECODE)
+    assert path.exists()
+
+    loaded = mz.SolverRegistry(path)
+    assert loaded.load() is not None
+    assert loaded.lookup(mz.GECODE).id == solver.id
+
+
+def test_get_available_solvers_refresh():
+    solvers = mz.get_available_solvers(refresh=True)
+    assert mz.get_available_solvers().count == solvers.count
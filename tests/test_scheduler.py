@@ -0,0 +1,78 @@
+"""
+Tests for the core budget scheduler
+"""
+
+import asyncio
+from unconstrained.minizinc.scheduler import CoreScheduler
+
+
+async def test_lone_solve_gets_every_core():
+    scheduler = CoreScheduler(cores=8)
+    async with scheduler.lease() as lease:
+        assert lease.threads == 8
+        assert scheduler.available == 0
+    assert scheduler.available == 8
+
+
+async def test_concurrent_solves_share_cores():
+    scheduler = CoreScheduler(cores=8)
+    leases = await asyncio.gather(*(scheduler.acquire() for _ in range(4)))
+    assert [lease.threads for lease in leases] == [2, 2, 2, 2]
+    assert scheduler.available == 0
+
+
+async def test_sequential_solver_leases_one_core():
+    scheduler = CoreScheduler(cores=8)
+    async with scheduler.lease(parallel=False) as lease:
+        assert lease.threads == 1
+
+
+async def test_busy_queue_caps_threads():
+    scheduler = CoreScheduler(cores=4, max_threads=2)
+    first = await scheduler.acquire()
+    second = await scheduler.acquire()
+    assert first.threads == second.threads == 2
+
+    waiting = asyncio.create_task(scheduler.acquire())
+    await asyncio.sleep(0)
+    assert scheduler.waiting == 1
+
+    first.release()
+    third = await waiting
+    assert third.threads == 2
+    second.release()
+    third.release()
+    assert scheduler.used == 0
+
+
+async def test_waiters_are_granted_by_priority():
+    scheduler = CoreScheduler(cores=1)
+    lease = await scheduler.acquire()
+    order = []
+
+    async def solve(name, priority):
+        async with scheduler.lease(priority=priority):
+            order.append(name)
+
+    tasks = [
+        asyncio.create_task(solve("low", 0)),
+        asyncio.create_task(solve("high", 5)),
+    ]
+    await asyncio.sleep(0)
+    lease.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["high", "low"]
+
+
+async def test_cancelled_waiter_does_not_leak_cores():
+    scheduler = CoreScheduler(cores=1)
+    lease = await scheduler.acquire()
+    waiting = asyncio.create_task(scheduler.acquire())
+    await asyncio.sleep(0)
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+
+    lease.release()
+    assert scheduler.waiting == 0
+    assert scheduler.used == 0
@@ -0,0 +1,58 @@
+"""
+Tests for typed solver statistics
+"""
+
+from datetime import timedelta
+from unconstrained import minizinc as mz
+from unconstrained.minizinc import Statistics, aggregate_statistics
+import pytest
+
+
+def test_statistics_from_solver():
+    stats = Statistics.from_mapping(dict(nodes=10, solveTime=timedelta(seconds=2), nSolutions=1))
+    assert stats.nodes == 10
+    assert stats.solveTime == 2.0
+    assert stats["nSolutions"] == 1
+    assert "failures" not in stats
+    assert stats.get("failures", 0) == 0
+    with pytest.raises(KeyError):
+        stats["failures"]
+
+
+def test_statistics_updated_is_a_copy():
+    first = Statistics.from_mapping(dict(nodes=10, flatTime=timedelta(seconds=1)))
+    second = first.updated(dict(nodes=25, extra_stat=3))
+    assert first.nodes == 10
+    assert first.extra == {}
+    assert second.to_dict() == dict(nodes=25, flatTime=1.0, extra_stat=3)
+
+
+def test_statistics_delta():
+    first = Statistics(nodes=10, failures=4, peakDepth=5)
+    second = Statistics(nodes=25, failures=4, peakDepth=3)
+    delta = second.delta(first)
+    assert delta.nodes == 15
+    assert delta.failures == 0
+    assert delta.peakDepth == 3
+
+
+def test_statistics_merge():
+    merged = Statistics(nodes=10, peakMem=2.0, method="min").merge(Statistics(nodes=5, peakMem=1.0))
+    assert merged.to_dict() == dict(nodes=15, peakMem=2.0, method="min")
+
+
+def test_aggregate_statistics():
+    summary = aggregate_statistics(Statistics(nodes=n, method="min") for n in range(1, 11))
+    assert summary["nodes"]["count"] == 10
+    assert summary["nodes"]["sum"] == 55
+    assert summary["nodes"]["mean"] == 5.5
+    assert summary["nodes"]["max"] == 10
+    assert summary["nodes"]["p50"] == 5.5
+    assert "method" not in summary
+
+
+def test_statistics_json_roundtrip():
+    result = mz.SolveResult(statistics=dict(nodes=3, initTime=timedelta(seconds=0.5)))
+    copy = mz.SolveResult.from_json_string(result.to_json_string())
+    assert isinstance(copy.statistics, Statistics)
+    assert copy.statistics == result.statistics
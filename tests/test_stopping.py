@@ -0,0 +1,89 @@
+"""
+Tests for early termination of solves
+"""
+
+import asyncio
+from unconstrained import minizinc as mz
+from unconstrained.minizinc.stopping import (
+    NoImprovement,
+    ObjectiveTarget,
+    RelativeGap,
+    Stopper,
+)
+
+
+def result(objective, gap=None, method=mz.MAXIMIZE):
+    return mz.SolveResult(method=method, objective=objective, relative_gap=gap)
+
+
+def test_relative_gap():
+    condition = RelativeGap(0.05)
+    assert not condition.check(result(10, gap=0.1))
+    assert condition.check(result(10, gap=0.05))
+
+
+def test_objective_target():
+    assert ObjectiveTarget(10).check(result(12))
+    assert not ObjectiveTarget(10).check(result(8))
+    assert ObjectiveTarget(10).check(result(8, method=mz.MINIMIZE))
+
+
+def test_no_improvement_in_solutions():
+    condition = NoImprovement(solutions=2)
+    assert not condition.check(result(1))
+    assert not condition.check(result(2))
+    assert not condition.check(result(2))
+    assert condition.check(result(1))
+
+
+async def producer(items, events, delay=0.0):
+    try:
+        for item in items:
+            await asyncio.sleep(delay)
+            yield item
+        await asyncio.sleep(10)
+    except asyncio.CancelledError:
+        events.append("cancelled")
+        raise
+
+
+async def test_stopper_cancels_when_stopped():
+    events = []
+    stopper = Stopper([ObjectiveTarget(2)])
+    seen = []
+    async for item in stopper.run(producer([1, 2, 3], events)):
+        seen.append(item)
+        stopper.check(result(item))
+
+    assert stopper.stopped
+    assert events == ["cancelled"]
+    assert seen[:2] == [1, 2]
+
+
+async def test_stopper_cancels_after_stall_window():
+    events = []
+    stopper = Stopper([NoImprovement(window=dict(seconds=0.05))])
+    seen = []
+    async for item in stopper.run(producer([1, 2], events)):
+        seen.append(item)
+        stopper.check(result(item))
+
+    assert seen == [1, 2]
+    assert stopper.stopped
+    assert events == ["cancelled"]
+
+
+async def test_stopper_forwards_errors():
+    async def failing():
+        yield 1
+        raise ValueError("boom")
+
+    stopper = Stopper([ObjectiveTarget(10)])
+    seen = []
+    try:
+        async for item in stopper.run(failing()):
+            seen.append(item)
+    except ValueError:
+        seen.append("error")
+
+    assert seen == [1, "error"]
@@ -0,0 +1,49 @@
+"""
+Tests for solve telemetry
+"""
+
+from unconstrained.minizinc.telemetry import Telemetry, Histogram
+
+
+def test_histogram_summary():
+    histogram = Histogram()
+    for i in range(1, 101):
+        histogram.observe(i)
+
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["mean"] == 50.5
+    assert summary["min"] == 1
+    assert summary["max"] == 100
+    assert summary["p50"] == 51
+
+
+def test_histogram_memory_is_bounded():
+    histogram = Histogram(size=10)
+    for i in range(1000):
+        histogram.observe(i)
+
+    assert histogram.count == 1000
+    assert len(histogram.samples) == 10
+    assert histogram.max == 999
+
+
+def test_events_are_only_sent_to_listeners():
+    telemetry = Telemetry()
+    events = []
+    assert not telemetry.enabled
+
+    telemetry.emit("ignored")
+    telemetry.subscribe(lambda event, fields: events.append((event, fields)))
+    telemetry.emit("result", status="OPTIMAL")
+
+    assert telemetry.enabled
+    assert events == [("result", dict(status="OPTIMAL"))]
+
+
+def test_sampling_skips_observations_but_not_counters():
+    telemetry = Telemetry(sample_rate=0.0)
+    telemetry.count("solves")
+    telemetry.observe("solve_time", 1.0)
+
+    assert telemetry.summary() == dict(counters=dict(solves=1), histograms={})
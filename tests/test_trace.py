@@ -0,0 +1,42 @@
+"""
+Tests for convergence traces
+"""
+
+import json
+from unconstrained.minizinc.trace import ConvergenceTrace, save_convergence_chart
+
+
+def make_trace():
+    trace = ConvergenceTrace("gecode")
+    trace.append(0.1, objective=5, nodes=10)
+    trace.append(0.2, objective=8, bound=10, absolute_gap=2, relative_gap=0.2, nodes=30)
+    trace.append(0.3, objective=10, bound=10, absolute_gap=0, relative_gap=0.0, nodes=50)
+    return trace
+
+
+def test_trace_columns():
+    trace = make_trace()
+    assert len(trace) == 3
+    assert trace.column("objective") == [5, 8, 10]
+    assert trace.column("bound") == [None, 10, 10]
+    assert trace.nbytes == 3 * 6 * 8
+
+
+def test_trace_json_roundtrip(tmp_path):
+    trace = make_trace()
+    path = trace.to_json(tmp_path / "trace.json")
+    copy = ConvergenceTrace.from_dict(json.loads(path.read_text()))
+    assert copy.to_dict() == trace.to_dict()
+
+
+def test_trace_to_csv(tmp_path):
+    path = make_trace().to_csv(tmp_path / "trace.csv")
+    lines = path.read_text().splitlines()
+    assert lines[0] == "elapsed,objective,bound,absolute_gap,relative_gap,nodes"
+    assert lines[1] == "0.1,5.0,,,,10.0"
+    assert len(lines) == 4
+
+
+def test_save_convergence_chart(tmp_path):
+    path = save_convergence_chart(tmp_path / "trace.html", make_trace(), width=400)
+    assert path.exists()
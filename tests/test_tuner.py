@@ -0,0 +1,75 @@
+"""
+Tests for solver configuration tuning
+"""
+
+from unconstrained import minizinc as mz
+from unconstrained.minizinc.tuner import score, trial, tuned_settings
+import unconstrained.minizinc.tuner as tuner
+
+
+def test_configurations():
+    base = mz.SolveOptions(threads=2)
+    space = mz.configurations(base, solver_ids=["gecode", "chuffed"], flatten_options=[mz.FLATTEN_SINGLE_PASS, mz.FLATTEN_TWO_PASS])
+    assert len(space) == 4
+    assert {options.threads for options in space} == {2}
+    assert {(options.solver_id, options.flatten_options) for options in space} == {
+        ("gecode", mz.FLATTEN_SINGLE_PASS),
+        ("gecode", mz.FLATTEN_TWO_PASS),
+        ("chuffed", mz.FLATTEN_SINGLE_PASS),
+        ("chuffed", mz.FLATTEN_TWO_PASS),
+    }
+
+
+def test_configurations_search_choices():
+    space = mz.configurations(mz.SolveOptions(), variable_choices=[None, mz.FIRST_FAIL, mz.DOM_W_DEG])
+    assert [options.variable_choice for options in space] == [None, mz.FIRST_FAIL, mz.DOM_W_DEG]
+    assert all(options.constrain_choice is None for options in space)
+
+
+def test_score_time_to_target():
+    result = mz.SolveResult(status=mz.FEASIBLE)
+    assert score(result, 1.5, 10, mz.TIME_TO_TARGET) == 1.5
+    assert score(result, None, 10, mz.TIME_TO_TARGET) == 20
+
+
+def test_score_gap_at_deadline():
+    assert score(mz.SolveResult(status=mz.OPTIMAL), None, 10, mz.GAP_AT_DEADLINE) == 0
+    assert score(mz.SolveResult(status=mz.FEASIBLE, relative_gap=0.25), None, 10, mz.GAP_AT_DEADLINE) == 0.25
+    assert score(mz.SolveResult(status=mz.FEASIBLE, relative_gap=None), None, 10, mz.GAP_AT_DEADLINE) == 1
+    assert score(mz.SolveResult(status=mz.TIMEOUT), None, 10, mz.GAP_AT_DEADLINE) == 2
+
+
+async def test_gap_at_deadline_scores_best_solution(monkeypatch):
+    async def solve(model, options, **kwargs):
+        yield mz.SolveResult(status=mz.FEASIBLE, objective=20, relative_gap=0.5)
+        yield mz.SolveResult(status=mz.FEASIBLE, objective=12, relative_gap=0.1)
+        yield mz.SolveResult(status=mz.TIMEOUT)
+
+    monkeypatch.setattr(tuner, "solve", solve)
+    run = await trial("", mz.SolveOptions(), None, "a", mz.GAP_AT_DEADLINE)
+    assert run.status == mz.TIMEOUT
+    assert run.score == 0.1
+
+
+def test_tuned_options(tmp_path):
+    cache = mz.TuningCache(tmp_path)
+    options = mz.SolveOptions(time_limit=dict(seconds=5))
+    assert mz.tuned_options(options, "rostering", cache) is options
+
+    cache.save("rostering", tuned_settings(mz.SolveOptions(solver_id="chuffed", threads=1, flatten_options=mz.FLATTEN_TWO_PASS)))
+    tuned = mz.tuned_options(options, "rostering", cache)
+    assert tuned.solver_id == "chuffed"
+    assert tuned.threads == 1
+    assert tuned.flatten_options == mz.FLATTEN_TWO_PASS
+    assert tuned.time_limit == options.time_limit
+
+
+async def test_tune(minizinc_options, tmp_path):
+    model = "int: n; var 1..n: x; solve maximize x;"
+    cache = mz.TuningCache(tmp_path)
+    space = mz.configurations(minizinc_options, threads=[1, 2])
+    tuning = await mz.tune(model, [dict(n=10), dict(n=20)], space, family="tiny", tuning_cache=cache, time_limit=dict(seconds=5))
+    assert len(tuning.trials) == 4
+    assert all(trial.status == mz.OPTIMAL for trial in tuning.trials)
+    assert tuning.best.threads in (1, 2)
+    assert cache.load("tiny") == tuned_settings(tuning.best)
@@ -1,15 +1,22 @@
 from .minizinc import (
     SolveOptions,
     FlattenOption,
+    VariableChoice,
+    ConstrainChoice,
     Method,
     Solver,
     get_solver,
     get_available_solvers,
     SolveResult,
+    Timings,
     solution,
     all_solutions,
     satisfy,
     solve,
+    race,
+    solve_many,
+    snapshot,
+    coalesce,
     Driver,
     get_driver,
     Status,
@@ -42,25 +49,116 @@ from .minizinc import (
     FLATTEN_TWO_PASS,
     FLATTEN_USE_GECODE,
     FLATTEN_SHAVE,
-    FLATTEN_SAC
+    FLATTEN_SAC,
+    DebugMode,
+    DEBUG_OFF,
+    DEBUG_ASYNC,
+    DEBUG_SAMPLED,
+    interfaces,
+    tuned_options
 )
 from .builder import (
-    ModelBuilder
+    ModelBuilder,
+    int_search,
+    bool_search,
+    seq_search,
+    restart_luby,
+    restart_geometric,
+    replace_search
+)
+from .debug import (
+    DebugWriter
+)
+from .registry import (
+    SolverRegistry,
+    registry
+)
+from .cache import (
+    DiskCache,
+    FlatZincCache,
+    ResultCache,
+    InterfaceCache,
+    TuningCache
+)
+from .trace import (
+    ConvergenceTrace,
+    convergence_chart,
+    save_convergence_chart
+)
+from .stopping import (
+    StopCondition,
+    RelativeGap,
+    ObjectiveTarget,
+    NoImprovement
+)
+from .scheduler import (
+    CoreScheduler,
+    Lease,
+    scheduler
+)
+from .lns import (
+    lns,
+    random_neighbourhood,
+    block_neighbourhood
+)
+from .decompose import (
+    solve_decomposed,
+    merge_results
+)
+from .data import (
+    write_data_file
+)
+from .enumeration import (
+    Enumeration,
+    stream_solutions,
+    read_solutions,
+    SymmetryIndex,
+    unique_solutions,
+    permutation_symmetries
+)
+from .tuner import (
+    tune,
+    configurations,
+    Criterion,
+    Tuning,
+    TIME_TO_TARGET,
+    GAP_AT_DEADLINE
+)
+from .flattening import (
+    FlattenHistory
+)
+from .stats import (
+    Statistics,
+    aggregate_statistics
+)
+from .telemetry import (
+    Telemetry,
+    Histogram,
+    telemetry
 )
 
 
 _all__ = [
     SolveOptions,
+    Timings,
     FlattenOption,
+    VariableChoice,
+    ConstrainChoice,
     Method,
     Solver,
     get_solver,
     get_available_solvers,
     SolveResult,
+    Statistics,
+    aggregate_statistics,
     solution,
     all_solutions,
     satisfy,
     solve,
+    race,
+    solve_many,
+    snapshot,
+    coalesce,
     Driver,
     get_driver,
     Status,
@@ -94,5 +192,57 @@ _all__ = [
     FLATTEN_USE_GECODE,
     FLATTEN_SHAVE,
     FLATTEN_SAC,
-    ModelBuilder
+    DebugMode,
+    DEBUG_OFF,
+    DEBUG_ASYNC,
+    DEBUG_SAMPLED,
+    ModelBuilder,
+    int_search,
+    bool_search,
+    seq_search,
+    restart_luby,
+    restart_geometric,
+    replace_search,
+    DebugWriter,
+    SolverRegistry,
+    registry,
+    DiskCache,
+    FlatZincCache,
+    ResultCache,
+    InterfaceCache,
+    interfaces,
+    Telemetry,
+    Histogram,
+    telemetry,
+    ConvergenceTrace,
+    convergence_chart,
+    save_convergence_chart,
+    StopCondition,
+    RelativeGap,
+    ObjectiveTarget,
+    NoImprovement,
+    CoreScheduler,
+    Lease,
+    scheduler,
+    lns,
+    random_neighbourhood,
+    block_neighbourhood,
+    solve_decomposed,
+    merge_results,
+    write_data_file,
+    Enumeration,
+    stream_solutions,
+    read_solutions,
+    SymmetryIndex,
+    unique_solutions,
+    permutation_symmetries,
+    TuningCache,
+    tuned_options,
+    tune,
+    configurations,
+    Criterion,
+    Tuning,
+    TIME_TO_TARGET,
+    GAP_AT_DEADLINE,
+    FlattenHistory
 ]
\ No newline at end of file
@@ -1,5 +1,7 @@
-from typing import List, Union, Literal
+from typing import Any, Iterable, List, Mapping, Union, Literal
 from textwrap import indent, dedent
+from enum import Enum
+import re
 from ..prelude import flatten, lst, enumerate1
 
 TypeInst = Union[Literal['var'], Literal['par']]
@@ -107,6 +109,9 @@ def value(x):
     elif isinstance(x, int):
         return str(x)
 
+    elif isinstance(x, float):
+        return repr(x)
+
     elif isinstance(x, str):
         return x
 
@@ -310,6 +315,255 @@ def predicate(name, body, **kwargs):
     return call("predicate", name, body, **kwargs)
 
 
+SOLVE_ITEM = re.compile(r"(?<![\w%])solve(?=\s*(::|satisfy|minimize|maximize))")
+
+
+def annotate_solve(model: str, *annotations: str) -> str:
+    """
+    Add annotations to the solve item of the given model
+
+    annotate_solve("solve minimize x;", "int_search(xs, input_order, indomain_min)")
+
+    "solve :: int_search(xs, input_order, indomain_min) minimize x;"
+
+    A model without a solve item is given a 'solve satisfy'
+    """
+    annotations = tuple(a for a in annotations if a)
+    if not annotations:
+        return model
+
+    anns = "".join(f" :: {a}" for a in annotations)
+
+    if SOLVE_ITEM.search(model) is None:
+        return model + f"\nsolve{anns} satisfy;\n"
+
+    return SOLVE_ITEM.sub(f"solve{anns}", model, count=1)
+
+
+METHOD = re.compile(r"\b(satisfy|minimize|maximize)\b")
+
+SEARCH = re.compile(r"\b(int|bool)_search\s*\(")
+
+# Annotations replaced when the search of a model is swapped
+SEARCH_ANNOTATION = re.compile(r"^\s*(\w+_search|restart_\w+)\b")
+
+
+def choice(x) -> str:
+    """
+    The MiniZinc name of a search choice
+    """
+    return x.value if isinstance(x, Enum) else str(x)
+
+
+def search(
+    kind: str, variables: str, variable_choice="input_order", constrain_choice="indomain_min"
+) -> str:
+    """
+    Create a search annotation
+
+    search("int", "q", FIRST_FAIL, INDOMAIN_MIN)
+
+    "int_search(q, first_fail, indomain_min)"
+    """
+    return f"{kind}_search({variables}, {choice(variable_choice)}, {choice(constrain_choice)})"
+
+
+def int_search(variables: str, variable_choice="input_order", constrain_choice="indomain_min") -> str:
+    return search("int", variables, variable_choice, constrain_choice)
+
+
+def bool_search(variables: str, variable_choice="input_order", constrain_choice="indomain_min") -> str:
+    return search("bool", variables, variable_choice, constrain_choice)
+
+
+def seq_search(*searches: str) -> str:
+    """
+    Search with each of the given annotations in turn
+
+    seq_search(int_search("x", FIRST_FAIL), bool_search("b"))
+
+    "seq_search([int_search(x, first_fail, indomain_min), bool_search(b, input_order, indomain_min)])"
+    """
+    return f"seq_search({array(*searches)})"
+
+
+def restart_luby(scale: int) -> str:
+    return f"restart_luby({scale})"
+
+
+def restart_geometric(base: float, scale: int) -> str:
+    return f"restart_geometric({value(float(base))}, {scale})"
+
+
+def split_top_level(text: str, separator: str) -> List[str]:
+    """
+    Split the text on separators that are not nested
+    inside brackets, braces or parentheses
+    """
+    parts = []
+    depth = 0
+    start = 0
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if c in "([{":
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+        elif depth == 0 and text.startswith(separator, i):
+            parts.append(text[start:i])
+            i += len(separator)
+            start = i
+            continue
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def closing(text: str, start: int) -> int:
+    """
+    The index of the parenthesis closing the one before `start`
+    """
+    depth = 1
+    for i in range(start, len(text)):
+        if text[i] in "([{":
+            depth += 1
+        elif text[i] in ")]}":
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError(f"Unbalanced annotation: {text[start:]}")
+
+
+def replace_search(model: str, *annotations: str) -> str:
+    """
+    Replace the search and restart annotations of the solve
+    item with the given ones, other annotations are kept
+
+    replace_search("solve :: int_search(q, first_fail, indomain_min) satisfy;", int_search("q", DOM_W_DEG))
+
+    "solve :: int_search(q, dom_w_deg, indomain_min) satisfy;"
+    """
+    annotations = tuple(a for a in annotations if a)
+    match = SOLVE_ITEM.search(model)
+    if match is None or (method := METHOD.search(model, match.end())) is None:
+        return annotate_solve(model, *annotations)
+
+    section = model[match.end() : method.start()]
+    kept = [
+        a.strip()
+        for a in split_top_level(section, "::")
+        if a.strip() and not SEARCH_ANNOTATION.match(a)
+    ]
+    anns = "".join(f" :: {a}" for a in [*kept, *annotations])
+    return model[: match.start()] + f"solve{anns} " + model[method.start() :]
+
+
+def swap_search_choices(model: str, variable_choice=None, constrain_choice=None) -> str:
+    """
+    Change the variable and/or constrain choice of every
+    int and bool search annotation in the solve item,
+    keeping the variables they search over
+
+    swap_search_choices("solve :: int_search(q, first_fail, indomain_min) satisfy;", DOM_W_DEG)
+
+    "solve :: int_search(q, dom_w_deg, indomain_min) satisfy;"
+    """
+    if variable_choice is None and constrain_choice is None:
+        return model
+
+    match = SOLVE_ITEM.search(model)
+    if match is None or (method := METHOD.search(model, match.end())) is None:
+        return model
+
+    section = model[match.end() : method.start()]
+    swapped = ""
+    position = 0
+    while (found := SEARCH.search(section, position)) is not None:
+        end = closing(section, found.end())
+        args = split_top_level(section[found.end() : end], ",")
+        if len(args) >= 3:
+            if variable_choice is not None:
+                args[1] = f" {choice(variable_choice)}"
+            if constrain_choice is not None:
+                args[2] = f" {choice(constrain_choice)}"
+        swapped += section[position : found.end()] + ",".join(args) + ")"
+        position = end + 1
+    swapped += section[position:]
+
+    return model[: match.end()] + swapped + model[method.start() :]
+
+
+def flat_values(x) -> List[Any]:
+    """
+    Flatten a (possibly nested) solution value into a list
+    """
+    if hasattr(x, "ravel"):
+        return x.ravel().tolist()
+    elif isinstance(x, (list, tuple)):
+        return [v for item in x for v in flat_values(item)]
+    else:
+        return [x]
+
+
+def warm_start(values: Mapping[str, Any]) -> str:
+    """
+    Create a warm start annotation for the given
+    variable values
+
+    warm_start(dict(x=[1, 2], b=True))
+
+    "warm_start_array([warm_start(array1d(x), [1, 2]), warm_start([b], [true])])"
+
+    Values that cannot be warm started (sets, strings)
+    are ignored
+    """
+    anns = []
+
+    for name, val in values.items():
+        if name.startswith("_") or name == "objective" or val is None:
+            continue
+
+        is_array = isinstance(val, (list, tuple)) or hasattr(val, "ravel")
+        items = flat_values(val)
+
+        if not items or not all(isinstance(v, (bool, int, float)) for v in items):
+            continue
+
+        var = f"array1d({name})" if is_array else f"[{name}]"
+        anns.append(f"warm_start({var}, {array(*map(value, items))})")
+
+    if not anns:
+        return ""
+
+    return f"warm_start_array({array(*anns)})"
+
+
+def fix(name: str, val: Any, positions: Iterable[int] | None = None) -> str:
+    """
+    Create a constraint fixing a variable to the given value,
+    for arrays only the given (zero based, flattened)
+    positions are fixed
+
+    fix("x", [3, 4, 5], [0, 2])
+
+    "constraint array1d(x)[1] = 3 /\\ array1d(x)[3] = 5;"
+    """
+    if not (isinstance(val, (list, tuple)) or hasattr(val, "ravel")):
+        return f"constraint {name} = {value(val)};"
+
+    items = flat_values(val)
+    if positions is None:
+        positions = range(len(items))
+
+    exprs = [f"array1d({name})[{i + 1}] = {value(items[i])}" for i in positions]
+    if not exprs:
+        return ""
+
+    conjunction = " /\\ ".join(exprs)
+    return f"constraint {conjunction};"
+
+
 class ModelBuilder:
     """
     Builder for MiniZinc '.mzn' models
@@ -565,6 +819,26 @@ class ModelBuilder:
         self.add_constraint(op, **kwargs)
 
 
+    def add_solve(self, *annotations, minimize=None, maximize=None):
+        """
+        Add the solve item with the given (search) annotations
+
+        builder.add_solve(int_search("q", FIRST_FAIL), restart_luby(100), minimize="cost")
+
+        "solve :: int_search(q, first_fail, indomain_min) :: restart_luby(100) minimize cost;"
+        """
+        anns = "".join(f" :: {a}" for a in annotations if a)
+
+        if minimize is not None:
+            goal = f"minimize {value(minimize)}"
+        elif maximize is not None:
+            goal = f"maximize {value(maximize)}"
+        else:
+            goal = "satisfy"
+
+        return self.add_expression(f"solve{anns} {goal}")
+
+
     def add_comment(self, text):
         self.add_text(f"% {text}")
 
@@ -0,0 +1,335 @@
+"""
+Caches for MiniZinc artifacts
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Iterable
+from collections import OrderedDict
+from threading import Lock
+from tempfile import gettempdir
+from shutil import copyfile
+from pendulum import Duration
+from uuid import uuid4
+import hashlib
+import json
+import logging
+import time
+import os
+
+from ..prelude import to_directory, to_duration
+
+log = logging.getLogger(__name__)
+
+
+MEGABYTE = 1024 * 1024
+
+
+def hash_key(*parts) -> str:
+    """
+    Create a stable cache key from the given parts
+
+    hash_key("var bool: b;", "gecode", 1) == "5e0b...
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            digest.update(part)
+        else:
+            digest.update(str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def hash_files(files: Iterable[Path], *parts) -> str:
+    """
+    Create a stable cache key from the contents
+    of the given files and any extra parts
+    """
+    digest = hashlib.sha256()
+    for file in files:
+        with open(file, "rb") as f:
+            while chunk := f.read(MEGABYTE):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return hash_key(digest.hexdigest(), *parts)
+
+
+def temporary_file(file: Path) -> Path:
+    """
+    A unique hidden file next to `file` to write to before
+    replacing it, so concurrent writers (processes or threads)
+    never share a temporary file
+    """
+    return file.with_name(f".{file.name}.{uuid4().hex}")
+
+
+class DiskCache:
+    """
+    A directory of files grouped into entries by key.
+
+    Each entry is made up of one file per suffix, eg:
+    '<key>.fzn' and '<key>.ozn'. Reading an entry marks
+    it as recently used (if `touch` is set) and the least
+    recently used entries are evicted once the total size
+    of the cache exceeds `max_bytes`.
+
+    Entries last written or used more than `max_age` ago
+    are treated as missing and removed.
+    """
+
+    suffixes: List[str] = [".bin"]
+    touch: bool = True
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        max_bytes: int = 256 * MEGABYTE,
+        max_age: Duration | dict | None = None,
+    ):
+        self.path = to_directory(path or default_cache_path(self), existing=False, create=True)
+        self.max_bytes = max_bytes
+        self.max_age = to_duration(max_age) if max_age else None
+        self.hits = 0
+        self.misses = 0
+
+    def is_expired(self, mtime: float) -> bool:
+        if self.max_age is None:
+            return False
+        return time.time() - mtime > self.max_age.total_seconds()
+
+    def files(self, key: str) -> List[Path]:
+        """
+        The files that make up the entry for the given key
+        """
+        return [self.path / f"{key}{suffix}" for suffix in self.suffixes]
+
+    def get(self, key: str) -> Optional[List[Path]]:
+        """
+        Get the files of the entry for the given key, or
+        None if the key is not in the cache
+        """
+        files = self.files(key)
+        try:
+            if any(self.is_expired(file.stat().st_mtime) for file in files):
+                self.remove(key)
+                self.misses += 1
+                return None
+            if self.touch:
+                for file in files:
+                    os.utime(file)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return files
+
+    def read(self, key: str) -> Optional[str]:
+        """
+        Read the text of a single file entry
+        """
+        files = self.get(key)
+        if files is None:
+            return None
+        return files[0].read_text()
+
+    def write(self, key: str, text: str) -> Path:
+        """
+        Write the text of a single file entry
+        """
+        file = self.files(key)[0]
+        temp = temporary_file(file)
+        temp.write_text(text)
+        os.replace(temp, file)
+        self.evict()
+        return file
+
+    def put(self, key: str, sources: Iterable[Path]) -> List[Path]:
+        """
+        Copy the given source files (one per suffix) into
+        the cache under the given key
+        """
+        files = self.files(key)
+        for source, file in zip(sources, files, strict=True):
+            temp = temporary_file(file)
+            copyfile(source, temp)
+            os.replace(temp, file)
+
+        self.evict()
+        return files
+
+    def entries(self) -> Dict[str, List[Path]]:
+        """
+        All entries in the cache by key
+        """
+        entries: Dict[str, List[Path]] = {}
+        for file in self.path.iterdir():
+            if file.name.startswith(".") or file.suffix not in self.suffixes:
+                continue
+            entries.setdefault(file.stem, []).append(file)
+        return entries
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of the cache in bytes
+        """
+        return sum(
+            file.stat().st_size for files in self.entries().values() for file in files
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def remove(self, key: str):
+        for file in self.files(key):
+            file.unlink(missing_ok=True)
+
+    def evict(self) -> int:
+        """
+        Evict the least recently used entries until the
+        cache fits in `max_bytes`, returning the number
+        of entries removed
+        """
+        entries = []
+        size = 0
+        for key, files in self.entries().items():
+            try:
+                stats = [file.stat() for file in files]
+            except FileNotFoundError:
+                continue
+            entry_size = sum(stat.st_size for stat in stats)
+            last_used = max(stat.st_mtime for stat in stats)
+            entries.append((last_used, entry_size, key))
+            size += entry_size
+
+        evicted = 0
+        for last_used, entry_size, key in sorted(entries):
+            if size <= self.max_bytes and not self.is_expired(last_used):
+                break
+            self.remove(key)
+            size -= entry_size
+            evicted += 1
+
+        if evicted:
+            log.debug("Evicted %d entries from %s", evicted, self.path)
+
+        return evicted
+
+    def clear(self):
+        for key in self.entries():
+            self.remove(key)
+
+    def __contains__(self, key: str) -> bool:
+        return all(file.exists() for file in self.files(key))
+
+    def __len__(self) -> int:
+        return len(self.entries())
+
+    def __str__(self):
+        return f"{type(self).__name__} at {self.path} ({self.hits} hits, {self.misses} misses)"
+
+    def __repr__(self):
+        return f"<{self!s}>"
+
+
+class FlatZincCache(DiskCache):
+    """
+    Compiled FlatZinc ('.fzn') and output ('.ozn') models
+    keyed by a hash of the model, data, solver and
+    flattening options used to compile them.
+    """
+
+    suffixes = [".fzn", ".ozn"]
+
+
+class ResultCache(DiskCache):
+    """
+    Serialized SolveResults of proven outcomes keyed by
+    a hash of the model, parameters and solve options.
+
+    Entries expire `max_age` after they were written.
+    """
+
+    suffixes = [".json"]
+    touch = False
+
+
+class TuningCache(DiskCache):
+    """
+    The tuned settings of the SolveOptions for each
+    model family, as found by `tune`.
+    """
+
+    suffixes = [".json"]
+    touch = False
+
+    def key(self, family: str) -> str:
+        return hash_key("tuning", family)
+
+    def load(self, family: str) -> Optional[Dict[str, Any]]:
+        if (text := self.read(self.key(family))) is None:
+            return None
+        return json.loads(text)
+
+    def save(self, family: str, settings: Dict[str, Any]) -> Path:
+        return self.write(self.key(family), json.dumps(settings))
+
+
+class InterfaceCache:
+    """
+    An in-memory LRU cache of analysed model interfaces
+    (method, inputs, outputs and solution type) keyed by a
+    hash of the model text, solver and parameters so that
+    MiniZinc only analyses each distinct model once.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, Any] = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            if (entry := self.entries.get(key)) is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: Any):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __str__(self):
+        return f"InterfaceCache of {len(self)} models ({self.hits} hits, {self.misses} misses)"
+
+    def __repr__(self):
+        return f"<{self!s}>"
+
+
+def default_cache_path(cache: DiskCache) -> Path:
+    return Path(gettempdir()) / "unconstrained" / type(cache).__name__.lower()
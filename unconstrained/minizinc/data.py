@@ -0,0 +1,105 @@
+"""
+Bulk MiniZinc data files
+"""
+
+from pathlib import Path
+from typing import Any, Mapping, TextIO
+from tempfile import NamedTemporaryFile
+from enum import EnumMeta
+import json
+
+from minizinc.json import MZNJSONEncoder
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Number of values encoded at a time
+CHUNK = 65536
+
+SEPARATORS = (",", ":")
+
+
+def encode(value: Any) -> str:
+    return json.dumps(value, cls=MZNJSONEncoder, separators=SEPARATORS)
+
+
+def write_array(file: TextIO, array: "np.ndarray"):
+    """
+    Write a NumPy array as nested JSON lists in chunks
+    of rows so memory use stays bounded
+    """
+    if array.ndim == 0:
+        file.write(encode(array.item()))
+        return
+
+    rows = max(1, CHUNK // max(1, array[0].size if len(array) else 1))
+    file.write("[")
+    for start in range(0, len(array), rows):
+        if start:
+            file.write(",")
+        file.write(encode(array[start : start + rows].tolist())[1:-1])
+    file.write("]")
+
+
+def write_value(file: TextIO, value: Any):
+    if np is not None and isinstance(value, np.ndarray):
+        write_array(file, value)
+    elif isinstance(value, (list, tuple)) and len(value) > CHUNK:
+        file.write("[")
+        for start in range(0, len(value), CHUNK):
+            if start:
+                file.write(",")
+            file.write(encode(list(value[start : start + CHUNK]))[1:-1])
+        file.write("]")
+    else:
+        file.write(encode(value))
+
+
+def write_data(file: TextIO, parameters: Mapping[str, Any]):
+    """
+    Stream the parameters to a MiniZinc '.json' data file
+    """
+    file.write("{")
+    for i, (name, value) in enumerate(parameters.items()):
+        if i:
+            file.write(",")
+        file.write(encode(name))
+        file.write(":")
+        write_value(file, value)
+    file.write("}")
+
+
+def write_data_file(path: Path | str, parameters: Mapping[str, Any]) -> Path:
+    """
+    Write the parameters to a MiniZinc '.json' data file
+    """
+    path = Path(path)
+    with open(path, "w") as file:
+        write_data(file, parameters)
+    return path
+
+
+def temporary_data_file(parameters: Mapping[str, Any]):
+    """
+    Write the parameters to a temporary '.json' data file
+    that is deleted once closed or garbage collected
+    """
+    file = NamedTemporaryFile("w", prefix="mzn_data_", suffix=".json", delete=True)
+    write_data(file, parameters)
+    file.flush()
+    return file
+
+
+def is_bulk(parameters: Mapping[str, Any]) -> bool:
+    """
+    True if any parameter is a NumPy array, these are
+    written in chunks of rows rather than converted to
+    one large list as python-minizinc would do
+    """
+    return np is not None and any(isinstance(v, np.ndarray) for v in parameters.values())
+
+
+def is_enum(value: Any) -> bool:
+    return isinstance(value, EnumMeta)
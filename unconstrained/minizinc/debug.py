@@ -0,0 +1,185 @@
+"""
+Background writer for MiniZinc debug artifacts
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Deque, List, Tuple, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from tempfile import gettempdir
+from threading import Lock
+import json
+import logging
+
+from minizinc.json import MZNJSONEncoder
+
+from ..prelude import to_directory, to_filename
+from .cache import MEGABYTE
+
+log = logging.getLogger(__name__)
+
+# The artifacts written to a debug directory
+SUFFIXES = (".mzn", ".json")
+
+
+class DebugWriter:
+    """
+    Writes the model and data of a solve to a debug
+    directory from a background thread so the event
+    loop is never blocked on file I/O.
+
+    Only the newest `max_files` files (totalling at most
+    `max_bytes`) are retained, counting the artifacts left
+    in the directory by earlier runs so it never grows past
+    the limits. The model and data of a solve are deleted
+    together and the newest solve is always kept, even if
+    it alone is over the limits. The directory should only
+    hold artifacts as any '.mzn' or '.json' file in it may
+    be deleted.
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        max_files: int = 100,
+        max_bytes: int = 64 * MEGABYTE,
+    ):
+        self.path = debug_directory(path)
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        # The files written by each solve and their total size
+        self.written: Deque[Tuple[List[Path], int]] = deque()
+        self.files = 0
+        self.bytes = 0
+        self.lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="minizinc-debug")
+        self.pending: Optional[Future] = None
+        self.scanned = False
+
+    def _scan(self):
+        """
+        Track the artifacts already in the directory,
+        oldest first, and apply the retention limits
+        """
+        try:
+            solves: Dict[str, Tuple[float, List[Path], int]] = {}
+            for file in self.path.iterdir():
+                if file.suffix in SUFFIXES and file.is_file():
+                    stat = file.stat()
+                    mtime, files, size = solves.get(file.stem, (0.0, [], 0))
+                    solves[file.stem] = (max(mtime, stat.st_mtime), [*files, file], size + stat.st_size)
+            with self.lock:
+                for _, files, size in sorted(solves.values()):
+                    self._track(files, size)
+                self._prune()
+        except Exception as e:
+            log.warning("Could not scan debug directory %s: %s", self.path, e)
+
+    def write(
+        self, name: str, key: str, model: str, parameters: Dict[str, Any] | None = None
+    ) -> Tuple[Path, Optional[Path]]:
+        """
+        Schedule the model (and data) to be written, returning
+        the paths they will be written to
+        """
+        if not self.scanned:
+            self.scanned = True
+            self.executor.submit(self._scan)
+
+        root = f"{to_filename(name)}_{key}"
+        model_file = self.path / f"{root}.mzn"
+        data_file = self.path / f"{root}.json" if parameters else None
+        self.pending = self.executor.submit(
+            self._write, model_file, model, data_file, parameters
+        )
+        return model_file, data_file
+
+    def _write(
+        self,
+        model_file: Path,
+        model: str,
+        data_file: Optional[Path],
+        parameters: Dict[str, Any] | None,
+    ):
+        files = []
+        try:
+            model_file.write_text(model)
+            files.append(model_file)
+            log.debug("model written to %s", model_file)
+
+            if data_file is not None:
+                data = json.dumps(parameters, cls=MZNJSONEncoder, ensure_ascii=False)
+                data_file.write_text(data)
+                files.append(data_file)
+                log.debug("data written to %s", data_file)
+
+        except Exception as e:
+            log.warning("Could not write debug artifact: %s", e)
+
+        if files:
+            self._retain(files)
+
+    def _retain(self, files: List[Path]):
+        """
+        Record the files written by a solve and delete the
+        oldest solves until the retention limits are met
+        """
+        size = sum(file.stat().st_size for file in files)
+        with self.lock:
+            self._track(files, size)
+            self._prune()
+
+    def _track(self, files: List[Path], size: int):
+        self.written.append((files, size))
+        self.files += len(files)
+        self.bytes += size
+
+    def _prune(self):
+        # The newest solve is kept so its result points at real files
+        while len(self.written) > 1 and (
+            self.files > self.max_files or self.bytes > self.max_bytes
+        ):
+            old_files, old_size = self.written.popleft()
+            for old in old_files:
+                old.unlink(missing_ok=True)
+            self.files -= len(old_files)
+            self.bytes -= old_size
+
+    def flush(self):
+        """
+        Wait for all scheduled writes to complete
+        """
+        if self.pending is not None:
+            self.pending.result()
+
+    def __str__(self):
+        return f"DebugWriter at {self.path} ({self.files} files)"
+
+    def __repr__(self):
+        return f"<{self!s}>"
+
+
+def debug_directory(path: Path | str | None = None) -> Path:
+    """
+    The directory debug artifacts are written to, defaulting
+    to a dedicated folder in the temp directory
+    """
+    path = path or Path(gettempdir()) / "unconstrained" / "debug"
+    return to_directory(path, existing=False, create=True).resolve()
+
+
+_writers_: Dict[Path, DebugWriter] = {}
+
+
+def get_debug_writer(
+    path: Path | str | None = None, max_files: int = 100, max_bytes: int = 64 * MEGABYTE
+) -> DebugWriter:
+    """
+    Get the shared writer for the given debug directory
+    """
+    path = debug_directory(path)
+    if (writer := _writers_.get(path)) is None:
+        writer = _writers_[path] = DebugWriter(path, max_files, max_bytes)
+    writer.max_files = max_files
+    writer.max_bytes = max_bytes
+    return writer
@@ -0,0 +1,193 @@
+"""
+Solving independent sub-problems in parallel
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import logging
+
+from ..prelude import to_duration
+from .stats import Statistics, to_statistics
+from .minizinc import (
+    Job,
+    SolveOptions,
+    SolveResult,
+    Status,
+    Timings,
+    Method,
+    solution,
+    solve_many,
+    OPTIMAL,
+    FEASIBLE,
+    THRESHOLD,
+    ERROR,
+    UNSATISFIABLE,
+    UNKNOWN,
+    UNBOUNDED,
+    TIMEOUT,
+    ALL_SOLUTIONS,
+)
+
+log = logging.getLogger(__name__)
+
+# The status of a combined result is the first of these held by any part
+STATUS_PRECEDENCE = [
+    ERROR,
+    UNSATISFIABLE,
+    UNBOUNDED,
+    UNKNOWN,
+    TIMEOUT,
+    THRESHOLD,
+    FEASIBLE,
+    ALL_SOLUTIONS,
+]
+
+
+def merge_statistics(statistics: Iterable[Statistics | Mapping[str, Any]]) -> Statistics:
+    """
+    Sum the numeric statistics of many solves, peaks
+    (depth and memory) take the maximum instead
+    """
+    merged = Statistics()
+    for stats in statistics:
+        merged = merged.merge(to_statistics(stats))
+    return merged
+
+
+def merge_status(statuses: Iterable[Status]) -> Status:
+    """
+    The status of a combined result, OPTIMAL only
+    if every part was solved to optimality and
+    ALL_SOLUTIONS if any part was enumerated
+    """
+    statuses = set(statuses)
+    for status in STATUS_PRECEDENCE:
+        if status in statuses:
+            return status
+    return OPTIMAL if statuses else UNKNOWN
+
+
+def merge_results(
+    results: Mapping[Hashable, SolveResult] | Iterable[SolveResult], name: str = "model"
+) -> SolveResult:
+    """
+    Combine the results of independent sub-problems into one.
+
+    Objectives and bounds are summed, statistics merged and
+    the variables of each part are found under its key.
+
+    result = merge_results({"ward 1": a, "ward 2": b})
+    result.objective == a.objective + b.objective
+    result["ward 1"]["x"] == a["x"]
+    """
+    if isinstance(results, Mapping):
+        parts = list(results.items())
+    else:
+        parts = list(enumerate(results))
+
+    combined = SolveResult(name=name)
+    if not parts:
+        combined.status = UNKNOWN
+        return combined
+
+    values = [part for _, part in parts]
+    methods = {part.method for part in values}
+    combined.method = methods.pop() if len(methods) == 1 else Method.SATISFY
+    combined.status = merge_status(part.status for part in values)
+    combined.solver_id = ",".join(sorted({part.solver_id for part in values}))
+    combined.error = "\n".join(f"{key}: {part.error}" for key, part in parts if part.error)
+    combined.start_time = min(part.start_time for part in values)
+    combined.end_time = max(part.end_time for part in values)
+    combined.iteration = sum(part.iteration for part in values)
+    combined.flatten_time = sum((part.flatten_time for part in values), to_duration())
+    combined.timings = sum((part.timings for part in values), Timings())
+    combined.statistics = merge_statistics(part.statistics for part in values)
+    combined.variables = {str(key): part.variables for key, part in parts}
+
+    combined.objective = None
+    combined.objective_bound = None
+    combined.absolute_gap = None
+    combined.relative_gap = None
+
+    if combined.method == Method.SATISFY:
+        return combined
+
+    if all(part.has_objective for part in values):
+        combined.objective = sum(part.objective for part in values)
+
+    if all(part.has_objective_bound for part in values):
+        combined.objective_bound = sum(part.objective_bound for part in values)
+
+    if combined.has_objective and combined.has_objective_bound:
+        combined.absolute_gap = abs(combined.objective - combined.objective_bound)
+        if combined.objective_bound:
+            combined.relative_gap = combined.absolute_gap / abs(combined.objective_bound)
+
+    return combined
+
+
+def solve_in_process(model: str, parameters: Optional[Dict[str, Any]], options: str, kwargs: Dict[str, Any]) -> str:
+    """
+    Solve a sub-problem in a worker process, results
+    are passed back as JSON
+    """
+    result = asyncio.run(
+        solution(model, SolveOptions.from_json_string(options), parameters=parameters, **kwargs)
+    )
+    return result.to_json_string()
+
+
+async def solve_decomposed(
+    parts: Mapping[Hashable, Job] | Iterable[Job],
+    concurrency: int | None = None,
+    processes: int | None = None,
+    name: str = "model",
+    **kwargs,
+) -> SolveResult:
+    """
+    Solve independent sub-problems concurrently and
+    merge their results into one.
+
+    Each MiniZinc solve already runs in its own process,
+    by default at most `concurrency` of them run at once
+    (see `solve_many`). If `processes` is given the Python
+    side of each solve also runs in a pool of that many
+    worker processes, in which case only plain (picklable)
+    keyword arguments can be passed.
+
+    result = await solve_decomposed({week: (model, data, options) for week, data in weeks})
+    """
+    if isinstance(parts, Mapping):
+        jobs: List[Tuple[Hashable, Job]] = list(parts.items())
+    else:
+        jobs = list(enumerate(parts))
+
+    results: Dict[Hashable, SolveResult] = {}
+
+    if not processes:
+        async for key, result in solve_many(dict(jobs), concurrency, name=name, **kwargs):
+            results[key] = result
+    else:
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = {
+                key: loop.run_in_executor(
+                    pool,
+                    solve_in_process,
+                    model,
+                    parameters,
+                    options.to_json_string(),
+                    kwargs | dict(name=f"{name} {key}"),
+                )
+                for key, (model, parameters, options) in jobs
+            }
+            for key, future in futures.items():
+                try:
+                    results[key] = SolveResult.from_json_string(await future)
+                except Exception as e:
+                    log.error('"%s %s" failed: %s', name, key, e)
+                    results[key] = SolveResult(name=f"{name} {key}", status=ERROR, error=str(e))
+
+    # Merge in the order the parts were given
+    return merge_results({key: results[key] for key, _ in jobs}, name=name)
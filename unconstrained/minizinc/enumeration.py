@@ -0,0 +1,230 @@
+"""
+Streaming enumeration of all solutions
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+from attrs import define, field
+import hashlib
+import gzip
+import json
+import logging
+
+from minizinc.json import MZNJSONEncoder
+
+from .minizinc import SolveOptions, SolveResult, solve, thaw
+from .data import SEPARATORS, encode
+
+log = logging.getLogger(__name__)
+
+# Maps the variables of a solution to those of a symmetric solution
+Symmetry = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+@define
+class Enumeration:
+    """
+    The outcome of a streamed enumeration, `result`
+    is the final result returned by MiniZinc and `unique`
+    the number of solutions written
+    """
+
+    count: int = 0
+    unique: int = 0
+    result: SolveResult = field(factory=SolveResult)
+    path: Optional[Path] = None
+
+
+def open_solutions(path: Path | str, mode: str = "r") -> TextIO:
+    """
+    Open a solutions file, compressed if it ends with '.gz'
+    """
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type:ignore
+    return open(path, mode, encoding="utf-8")
+
+
+def solution_variables(result: SolveResult, variables: Iterable[str] | None = None) -> Dict[str, Any]:
+    """
+    The (public) variables of a solution to write out,
+    thawed from their frozen form so they can be encoded
+    """
+    if variables is None:
+        variables = [name for name in result.variables if not name.startswith("_")]
+    return {name: thaw(result.variables[name]) for name in variables}
+
+
+def solution_key(solution: Dict[str, Any]) -> str:
+    thawed = {name: thaw(value) for name, value in solution.items()}
+    return json.dumps(thawed, cls=MZNJSONEncoder, sort_keys=True, separators=SEPARATORS)
+
+
+def canonical(solution: Dict[str, Any], symmetries: Iterable[Symmetry]) -> Tuple[str, Dict[str, Any]]:
+    """
+    The canonical form of a solution, the least (by its
+    JSON encoding) of the solution and its symmetric images
+    """
+    best_key, best = solution_key(solution), solution
+    for symmetry in symmetries:
+        image = symmetry(solution)
+        if (key := solution_key(image)) < best_key:
+            best_key, best = key, image
+    return best_key, best
+
+
+class SymmetryIndex:
+    """
+    The symmetry classes of the solutions seen so far.
+
+    Only a 128 bit digest of each canonical form is kept
+    so memory is proportional to the number of classes.
+
+    index = SymmetryIndex(nqueens.symmetries)
+    unique = [form for s in solutions if (form := index.add(s)) is not None]
+    """
+
+    def __init__(self, symmetries: Iterable[Symmetry]):
+        self.symmetries: List[Symmetry] = list(symmetries)
+        self.digests: Set[bytes] = set()
+
+    def digest(self, key: str) -> bytes:
+        return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+    def add(self, solution: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        The canonical form of the solution if it is the
+        first of its class, otherwise None
+        """
+        key, form = canonical(solution, self.symmetries)
+        digest = self.digest(key)
+        if digest in self.digests:
+            return None
+        self.digests.add(digest)
+        return form
+
+    def __contains__(self, solution: Dict[str, Any]) -> bool:
+        key, _ = canonical(solution, self.symmetries)
+        return self.digest(key) in self.digests
+
+    def __len__(self) -> int:
+        return len(self.digests)
+
+
+def unique_solutions(
+    solutions: Iterable[Dict[str, Any]], symmetries: Iterable[Symmetry]
+) -> Iterator[Dict[str, Any]]:
+    """
+    The canonical form of each class of symmetric solutions
+    """
+    index = SymmetryIndex(symmetries)
+    for solution in solutions:
+        if (form := index.add(solution)) is not None:
+            yield form
+
+
+def permutation_symmetries(name: str) -> List[Symmetry]:
+    """
+    The 7 (non identity) symmetries of a square board stored
+    as a permutation, where `name[i]` is the (1 based) row
+    of the piece in column i, eg: the queens of n-queens
+    """
+
+    def flip(rows: List[int]) -> List[int]:
+        return rows[::-1]
+
+    def mirror(rows: List[int]) -> List[int]:
+        return [len(rows) + 1 - row for row in rows]
+
+    def transpose(rows: List[int]) -> List[int]:
+        columns = [0] * len(rows)
+        for col, row in enumerate(rows, start=1):
+            columns[row - 1] = col
+        return columns
+
+    def symmetry(*steps: Callable[[List[int]], List[int]]) -> Symmetry:
+        def apply(solution: Dict[str, Any]) -> Dict[str, Any]:
+            rows = list(solution[name])
+            for step in steps:
+                rows = step(rows)
+            return solution | {name: rows}
+
+        return apply
+
+    return [
+        symmetry(flip),
+        symmetry(mirror),
+        symmetry(flip, mirror),
+        symmetry(transpose),
+        symmetry(flip, transpose),
+        symmetry(mirror, transpose),
+        symmetry(flip, mirror, transpose),
+    ]
+
+
+def read_solutions(path: Path | str) -> Iterator[Dict[str, Any]]:
+    """
+    Read the solutions written by `stream_solutions`
+    one at a time
+    """
+    with open_solutions(path) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+async def stream_solutions(
+    model: str,
+    options: SolveOptions,
+    path: Path | str | None = None,
+    variables: Iterable[str] | None = None,
+    symmetries: Iterable[Symmetry] | None = None,
+    parameters=None,
+    **kwargs,
+) -> Enumeration:
+    """
+    Enumerate all solutions of the model, writing each to
+    `path` as a line of JSON as it arrives.
+
+    Unlike `all_solutions` no results are kept so memory
+    stays bounded however many solutions there are. Only
+    the given `variables` (or all public ones) are written.
+    If no `path` is given the solutions are only counted.
+
+    Given `symmetries` only the canonical form of the first
+    solution of each symmetry class is written.
+
+    enumeration = await stream_solutions(model, options, "queens.ndjson.gz")
+    for solution in read_solutions(enumeration.path):
+        ...
+    """
+    variables = list(variables) if variables is not None else None
+    name = kwargs.get("name", "model")
+    enumeration = Enumeration(path=Path(path) if path is not None else None)
+    index = SymmetryIndex(symmetries) if symmetries is not None else None
+    file = open_solutions(path, "w") if path is not None else None
+
+    # The last result is MiniZinc's final status, so
+    # each solution is written once the next arrives
+    pending: Optional[SolveResult] = None
+    try:
+        async for result in solve(model, options=options, parameters=parameters, all_solutions=True, **kwargs):
+            if pending is not None:
+                enumeration.count += 1
+                solution: Optional[Dict[str, Any]] = solution_variables(pending, variables)
+                if index is not None:
+                    solution = index.add(solution)  # type:ignore
+                if solution is not None:
+                    enumeration.unique += 1
+                    if file is not None:
+                        file.write(encode(solution))
+                        file.write("\n")
+            pending = result
+    finally:
+        if file is not None:
+            file.close()
+
+    if pending is not None:
+        enumeration.result = pending
+    log.info('"%s" enumerated %d solutions (%d unique)', name, enumeration.count, enumeration.unique)
+    return enumeration
@@ -0,0 +1,164 @@
+"""
+Choosing the flatten level of a model from its history
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from threading import Lock
+from tempfile import NamedTemporaryFile
+import json
+import logging
+import os
+import random
+
+log = logging.getLogger(__name__)
+
+# The flatten levels tried by default (FlattenOption values)
+LEVELS = (1, 2, 3, 4, 5)
+
+# A run that is not proven costs this multiple of the time limit
+PENALTY = 2.0
+
+
+def run_cost(elapsed: float, reached: bool, time_limit: float, gap: Optional[float] = None) -> float:
+    """
+    The cost of a run in seconds, lower is better.
+
+    Proven runs cost their elapsed time (flattening included),
+    others twice the time limit scaled up by their relative gap
+    so unproven levels are still ordered by how close they got.
+    """
+    if reached:
+        return elapsed
+    return PENALTY * time_limit * (1.0 + (1.0 if gap is None else min(abs(gap), 1.0)))
+
+
+def level_value(level: Any) -> int:
+    return int(getattr(level, "value", level))
+
+
+class FlattenHistory:
+    """
+    Records the flatten and solve times of each flatten level
+    for each model structure (a hash of the model, solver and
+    parameter types) and picks the level of later solves.
+
+    Levels are chosen epsilon-greedily: every level is tried
+    `min_runs` times, after which the level with the lowest
+    mean cost is used except for a random level `epsilon` of
+    the time, so a level that starts paying off as the data
+    grows is still found.
+
+    The history is kept in memory or, if a `path` is given,
+    in a JSON file that is updated after every run. Saving
+    blocks so solves record to it from a worker thread.
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        epsilon: float = 0.1,
+        levels: Iterable[Any] = LEVELS,
+        min_runs: int = 1,
+        seed: int | None = None,
+    ):
+        self.path = Path(path) if path is not None else None
+        self.epsilon = epsilon
+        self.levels = [level_value(level) for level in levels]
+        self.min_runs = max(1, min_runs)
+        self.rng = random.Random(seed)
+        self.lock = Lock()
+        self.save_lock = Lock()
+        self.entries: Dict[str, Dict[str, Dict[str, float]]] = {}
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def load(self):
+        assert self.path is not None
+        try:
+            self.entries = json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            log.warning("Could not load flatten history from %s: %s", self.path, e)
+            self.entries = {}
+
+    def save(self):
+        """
+        Write the history to its file, only the (quick) encoding
+        holds the lock so `choose` is never blocked on the disk
+        """
+        if self.path is None:
+            return
+        with self.save_lock:
+            with self.lock:
+                text = json.dumps(self.entries)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with NamedTemporaryFile(
+                "w", dir=self.path.parent, prefix=f".{self.path.name}.", delete=False
+            ) as file:
+                file.write(text)
+            os.replace(file.name, self.path)
+
+    def runs(self, key: str, level: Any) -> Dict[str, float]:
+        """
+        The totals recorded for a level of a model structure
+        """
+        return self.entries.get(key, {}).get(str(level_value(level)), dict(runs=0, cost=0.0, flatten=0.0, solve=0.0))
+
+    def mean_cost(self, key: str, level: Any) -> Optional[float]:
+        runs = self.runs(key, level)
+        return runs["cost"] / runs["runs"] if runs["runs"] else None
+
+    def best(self, key: str) -> Optional[int]:
+        """
+        The level with the lowest mean cost so far
+        """
+        costs = [(cost, level) for level in self.levels if (cost := self.mean_cost(key, level)) is not None]
+        return min(costs)[1] if costs else None
+
+    def choose(self, key: str) -> int:
+        """
+        The flatten level to use for the next run
+        """
+        with self.lock:
+            untried = [level for level in self.levels if self.runs(key, level)["runs"] < self.min_runs]
+            if untried:
+                level = untried[0]
+                reason = "exploring"
+            elif self.rng.random() < self.epsilon:
+                level = self.rng.choice(self.levels)
+                reason = "exploring"
+            else:
+                level = self.best(key)  # type:ignore
+                reason = "exploiting"
+        log.debug("Flatten level %d chosen for %s (%s)", level, key[:8], reason)
+        return level
+
+    def record(self, key: str, level: Any, flatten: float, solve: float, cost: float):
+        """
+        Record the flatten and solve seconds, and cost, of a run
+        """
+        with self.lock:
+            levels = self.entries.setdefault(key, {})
+            runs = levels.setdefault(str(level_value(level)), dict(runs=0, cost=0.0, flatten=0.0, solve=0.0))
+            runs["runs"] += 1
+            runs["cost"] += cost
+            runs["flatten"] += flatten
+            runs["solve"] += solve
+        self.save()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        self.save()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __str__(self):
+        return f"FlattenHistory of {len(self)} models"
+
+    def __repr__(self):
+        return f"<{self!s}>"
@@ -0,0 +1,201 @@
+"""
+Large Neighbourhood Search over MiniZinc solves
+"""
+
+from typing import AsyncIterable, Callable, Dict, Iterable, List, Mapping, Optional
+from attrs import evolve
+from pendulum import Duration
+import asyncio
+import logging
+import math
+import random
+import time
+
+from ..prelude import to_duration, enumerate1
+from .builder import fix, flat_values
+from .minizinc import (
+    SolveOptions,
+    SolveResult,
+    Method,
+    FEASIBLE,
+    solution,
+)
+from .stopping import improves
+
+log = logging.getLogger(__name__)
+
+# Chooses the (zero based, flattened) positions of each variable
+# to fix to their value in the best solution so far
+Neighbourhood = Callable[[SolveResult, random.Random], Mapping[str, Iterable[int]]]
+
+
+def decision_variables(result: SolveResult) -> List[str]:
+    """
+    The names of the numeric array variables of the result,
+    scalars (such as the cost being optimised) are usually
+    derived from the arrays so are left free
+    """
+    names = []
+    for name, val in result.variables.items():
+        if name.startswith("_") or name == "objective" or val is None:
+            continue
+        if isinstance(val, (bool, int, float)):
+            continue
+        if all(isinstance(v, (bool, int, float)) for v in flat_values(val)):
+            names.append(name)
+    return names
+
+
+def random_neighbourhood(variables: Iterable[str] | None = None, fix_rate: float = 0.8) -> Neighbourhood:
+    """
+    Fix a random `fix_rate` (rounded down) of the positions
+    of each variable, always leaving at least one free
+    """
+
+    def choose(result: SolveResult, rng: random.Random) -> Dict[str, List[int]]:
+        fixed = {}
+        for name in variables or decision_variables(result):
+            size = len(flat_values(result.variables[name]))
+            count = min(size - 1, math.floor(size * fix_rate))
+            fixed[name] = sorted(rng.sample(range(size), max(0, count)))
+        return fixed
+
+    return choose
+
+
+def block_neighbourhood(variables: Iterable[str] | None = None, free_rate: float = 0.2) -> Neighbourhood:
+    """
+    Free a random contiguous block of `free_rate` of the
+    positions of each variable and fix the rest, eg: a run
+    of days in a roster stored row by row
+    """
+
+    def choose(result: SolveResult, rng: random.Random) -> Dict[str, List[int]]:
+        fixed = {}
+        for name in variables or decision_variables(result):
+            size = len(flat_values(result.variables[name]))
+            width = max(1, round(size * free_rate))
+            start = rng.randrange(max(1, size - width + 1))
+            fixed[name] = [i for i in range(size) if not start <= i < start + width]
+        return fixed
+
+    return choose
+
+
+def neighbourhood_model(model: str, best: SolveResult, fixed: Mapping[str, Iterable[int]]) -> str:
+    """
+    The model restricted to the neighbourhood of the best solution
+    """
+    constraints = [fix(name, best.variables[name], positions) for name, positions in fixed.items()]
+    return "\n".join([model, *filter(None, constraints)])
+
+
+async def lns(
+    model: str,
+    options: SolveOptions,
+    neighbourhood: Neighbourhood | None = None,
+    initial: SolveResult | None = None,
+    time_limit: Duration | dict | None = None,
+    neighbourhood_time_limit: Duration | dict = dict(seconds=1),
+    parallel: int = 1,
+    seed: int | None = None,
+    max_failures: int = 3,
+    **kwargs,
+) -> AsyncIterable[SolveResult]:
+    """
+    Improve a solution with Large Neighbourhood Search.
+
+    Starting from the `initial` result (or a first solve
+    limited to `neighbourhood_time_limit`) part of the best
+    solution is fixed by the `neighbourhood` (a random 80% of
+    every array variable by default) and the rest re-solved with the
+    best solution as a warm start. `parallel` neighbourhoods
+    are solved at once and the best improvement is accepted.
+
+    Every improved solution is yielded until `time_limit`
+    (defaulting to `options.time_limit`) has passed. The search
+    ends early if the solution is already proven (or the model
+    has no objective to improve) or after `max_failures`
+    iterations in a row in which every neighbourhood failed.
+
+    async for result in lns(model, options, parallel=4):
+        ...
+    """
+    neighbourhood = neighbourhood or random_neighbourhood()
+    rng = random.Random(seed)
+    deadline = time.monotonic() + to_duration(time_limit or options.time_limit).total_seconds()
+    step = to_duration(neighbourhood_time_limit).total_seconds()
+    name = kwargs.pop("name", "model")
+
+    def remaining() -> float:
+        return deadline - time.monotonic()
+
+    def limited(seconds: float) -> SolveOptions:
+        return evolve(options, time_limit=dict(seconds=max(0.01, min(step, seconds))))
+
+    best = initial
+    if best is None:
+        best = await solution(model, limited(remaining()), name=name, **kwargs)
+        if not best.has_solution:
+            yield best
+            return
+        yield best
+
+    if best.status.is_proven or best.method == Method.SATISFY:
+        log.debug('"%s" LNS has nothing to improve (%s)', name, best.status.name)
+        return
+
+    iteration = 0
+    failures = 0
+    while remaining() > 0:
+        iteration += 1
+        neighbourhoods = [neighbourhood(best, rng) for _ in range(max(1, parallel))]
+        candidates = await asyncio.gather(
+            *(
+                solution(
+                    neighbourhood_model(model, best, fixed),
+                    limited(remaining()),
+                    name=f"{name} neighbourhood {iteration}.{i}",
+                    warm_start=best,
+                    **kwargs,
+                )
+                for i, fixed in enumerate1(neighbourhoods)
+            ),
+            return_exceptions=True,
+        )
+
+        if all(isinstance(candidate, BaseException) for candidate in candidates):
+            failures += 1
+            if failures >= max_failures:
+                log.error('"%s" LNS stopped after %d failed iterations: %s', name, failures, candidates[0])
+                return
+        else:
+            failures = 0
+
+        improved: Optional[SolveResult] = None
+        for candidate in candidates:
+            if isinstance(candidate, BaseException):
+                log.warning('"%s" neighbourhood failed: %s', name, candidate)
+                continue
+            if candidate.has_solution and improves(
+                candidate.objective, (improved or best).objective, best.method
+            ):
+                improved = candidate
+
+        if improved is None:
+            continue
+
+        log.debug('"%s" LNS improved objective to %s', name, improved.objective)
+        # Optimality and bounds only hold within the neighbourhood
+        best = evolve(
+            improved,
+            name=name,
+            model_string=model,
+            status=FEASIBLE,
+            iteration=best.iteration + 1,
+            start_time=best.start_time,
+            objective_bound=None,
+            absolute_gap=None,
+            relative_gap=None,
+        )
+        yield best
@@ -1,22 +1,19 @@
 from pathlib import Path
-from typing import AsyncIterable, Tuple, List, Optional, Dict, Any
-from datetime import timedelta
+from typing import AsyncIterable, Tuple, List, Optional, Dict, Any, Iterable, Mapping, Hashable
 from minizinc import Method
 from minizinc import Result as MzResult
 from minizinc import Solver 
 from minizinc import Status as MzStatus
 from minizinc import Instance
 from minizinc import Driver
-from typing import TypedDict
-from shutil import copy
-from attrs import field, define
-from enum import Enum
-from tempfile import gettempdir
+from minizinc.json import MZNJSONEncoder, MZNJSONDecoder
+from types import MappingProxyType
+from attrs import field, define, evolve
+from enum import Enum, EnumMeta
+from uuid import uuid4
 from pendulum import DateTime, Duration, Interval
 from ..prelude import (
-    to_filename,
-    to_directory,
-    to_filepath,
+    json_converter,
     now,
     to_elapsed,
     to_interval,
@@ -31,79 +28,54 @@ from ..prelude import (
     enum_field,
     dict_field,
     bool_field,
+    float_field,
     BaseModel,
 )
+from .registry import registry
+from .builder import (
+    annotate_solve,
+    replace_search,
+    swap_search_choices,
+    warm_start as warm_start_annotation,
+)
+from .debug import get_debug_writer
+from .trace import ConvergenceTrace
+from .stats import Statistics, to_statistics
+from .scheduler import CoreScheduler, leased
+from .data import temporary_data_file, is_bulk, is_enum
+from .stopping import StopCondition, Stopper, stop_conditions
+from .telemetry import Telemetry, telemetry as default_telemetry
+from .flattening import FlattenHistory, run_cost
+from .cache import FlatZincCache, ResultCache, InterfaceCache, TuningCache, hash_files, hash_key, MEGABYTE
+import os
+import json
+import random
+import time
 import math
+import asyncio
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
-
 log = logging.getLogger(__name__)
 
 
-class Statistics(TypedDict, total=False):
-    # Number of search nodes
-    nodes: int
-    # Number of leaf nodes that were failed
-    failures: int
-    # Number of times the solver restarted the search
-    restarts: int
-    # Number of variables
-    variables: int
-    # Number of integer variables created by the solver
-    intVariables: int
-    # Number of Boolean variables created by the solver
-    boolVariables: int
-    # Number of floating point variables created by the solver
-    floatVariables: int
-    # Number of set variables created by the solver
-    setVariables: int
-    # Number of propagators created by the solver
-    propagators: int
-    # Number of propagator invocations
-    propagations: int
-    # Peak depth of search tree
-    peakDepth: int
-    # Number of nogoods created
-    nogoods: int
-    # Number of backjumps
-    backjumps: int
-    # Peak memory (in Mbytes)
-    peakMem: float
-    # Initialisation time
-    initTime: timedelta
-    # Solving time
-    solveTime: timedelta
-    # Flattening time
-    flatTime: timedelta
-    # Number of paths generated
-    paths: int
-    # Number of Boolean variables in the flat model
-    flatBoolVars: int
-    # Number of floating point variables in the flat model
-    flatFloatVars: int
-    # Number of integer variables in the flat model
-    flatIntVars: int
-    # Number of set variables in the flat model
-    flatSetVars: int
-    # Number of Boolean constraints in the flat model
-    flatBoolConstraints: int
-    # Number of floating point constraints in the flat model
-    flatFloatConstraints: int
-    # Number of integer constraints in the flat model
-    flatIntConstraints: int
-    # Number of set constraints in the flat model
-    flatSetConstraints: int
-    # Optimisation method in the Flat Model
-    method: str
-    # Number of reified constraints evaluated during flattening
-    evaluatedReifiedConstraints: int
-    # Number of half-reified constraints evaluated during flattening
-    evaluatedHalfReifiedConstraints: int
-    # Number of implications removed through chain compression
-    eliminatedImplications: int
-    # Number of linear constraints removed through chain compression
-    eliminatedLinearConstraints: int
+try:
+    import numpy as np
+
+    json_converter.register_unstructure_hook(np.ndarray, lambda a: a.tolist())
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def require_numpy():
+    """
+    Get the numpy module, raising a helpful error
+    if the optional dependency is not installed
+    """
+    if np is None:
+        raise ImportError(
+            "NumPy is required for array solutions, install it with `pip install unconstrained[numpy]`"
+        )
+    return np
 
 
 # Expose methods at top levl
@@ -119,6 +91,10 @@ GECODE = "gecode"
 COINBC = "coin-bc"
 
 
+# Solvers that make use of warm_start annotations
+WARM_START_SOLVERS = [GECODE, ORTOOLS, COINBC, "cbc", "gurobi", "cplex", "scip", "xpress", "highs"]
+
+
 def get_solver(x) -> Solver:
     """
     Get an installed solver from the
@@ -128,12 +104,15 @@ def get_solver(x) -> Solver:
     if isinstance(x, Solver):
         return x
 
-    solver = Solver.lookup(x)
+    return registry.lookup(x)
 
-    if not solver:
-        raise ValueError(f"Could not parse solver from {x}")
 
-    return solver
+def supports_warm_start(solver: Solver) -> bool:
+    """
+    Does the given solver make use of warm start annotations?
+    """
+    names = [solver.id, solver.id.split(".")[-1], *solver.tags]
+    return any(name in WARM_START_SOLVERS for name in names)
 
 
 def get_driver() -> Driver:
@@ -141,25 +120,22 @@ def get_driver() -> Driver:
     Get the MiniZinc driver, throws an
     exception if not found
     """
-    driver = Driver.find()
-    if driver is None:
-        raise Exception("MiniZinc is not installed")
-    return driver
+    return registry.driver
 
 
-def get_available_solvers() -> Map[str, Solver, Id]:
+def get_available_solvers(refresh: bool = False) -> Map[str, Solver, Id]:
     """
-    Get the available solvers
+    Get the available solvers, these are discovered
+    once per installation unless `refresh` is set
     """
     solvers = Map(str, Solver, "id")
-    driver = get_driver()
+    tag_solvers = registry.refresh() if refresh else registry.solvers
 
-    for tag, tag_solvers in driver.available_solvers(True).items():
+    for tag, tag_solvers in tag_solvers.items():
         for solver in tag_solvers:
             solvers.add(solver)
 
-    for solver in solvers:
-        log.info(f'MiniZinc Solver "{solver.name}" is installed')
+    log.debug("%d MiniZinc solvers are installed", solvers.count)
 
     return solvers
 
@@ -183,6 +159,10 @@ class Status(Enum):
     def is_error(self):
         return self in [Status.ERROR, Status.UNKNOWN, Status.UNBOUNDED]
 
+    @property
+    def is_proven(self):
+        return self in [Status.OPTIMAL, Status.UNSATISFIABLE, Status.ALL_SOLUTIONS]
+
 
 class VariableChoice(Enum):
     # choose in order from the array
@@ -216,7 +196,8 @@ class FlattenOption(Enum):
     For some combinations of model and target solver,
     this can lead to substantial improvements in solving time.
     However, the additional time spent on the first compilation pass
-    does not always pay off.
+    does not always pay off, a `FlattenHistory` can learn which
+    level pays off for each model.
     """
 
     # Do not optimiser flattening
@@ -233,6 +214,23 @@ class FlattenOption(Enum):
     SAC = 5
 
 
+class DebugMode(Enum):
+    """
+    Whether the model and data of each solve are
+    written to the debug directory for inspection.
+
+    Artifacts are written from a background thread
+    so they never block the event loop.
+    """
+
+    # Do not write debug artifacts (default)
+    OFF = "off"
+    # Write the artifacts of every solve
+    ASYNC = "async"
+    # Write the artifacts of a random sample of solves
+    SAMPLED = "sampled"
+
+
 # Expose solve status at top level
 FEASIBLE = Status.FEASIBLE
 OPTIMAL = Status.OPTIMAL
@@ -259,6 +257,12 @@ INDOMAIN_SPLIT = ConstrainChoice.INDOMAIN_SPLIT
 INDOMAIN_RANDOM = ConstrainChoice.INDOMAIN_RANDOM
 
 
+# Expose debug modes at top level
+DEBUG_OFF = DebugMode.OFF
+DEBUG_ASYNC = DebugMode.ASYNC
+DEBUG_SAMPLED = DebugMode.SAMPLED
+
+
 # Expose Flatten Options at top level
 FLATTEN_NONE = FlattenOption.NONE
 FLATTEN_SINGLE_PASS = FlattenOption.SINGLE_PASS
@@ -268,6 +272,51 @@ FLATTEN_SHAVE = FlattenOption.SHAVE
 FLATTEN_SAC = FlattenOption.SAC
 
 
+@define
+class Timings:
+    """
+    Wall-clock time spent in each phase of a solve
+    """
+
+    # Building the model, data and MiniZinc Instance
+    assembly: Duration = duration_field()
+    # Analysing the model interface
+    analysis: Duration = duration_field()
+    # Compiling the model to FlatZinc
+    flatten: Duration = duration_field()
+    # Initialising the solver
+    init: Duration = duration_field()
+    # Searching for solutions
+    search: Duration = duration_field()
+    # Converting MiniZinc output to SolveResults
+    extraction: Duration = duration_field()
+
+    @property
+    def total(self) -> Duration:
+        return (
+            self.assembly
+            + self.analysis
+            + self.flatten
+            + self.init
+            + self.search
+            + self.extraction
+        )
+
+    def __add__(self, other: "Timings") -> "Timings":
+        return Timings(
+            assembly=self.assembly + other.assembly,
+            analysis=self.analysis + other.analysis,
+            flatten=self.flatten + other.flatten,
+            init=self.init + other.init,
+            search=self.search + other.search,
+            extraction=self.extraction + other.extraction,
+        )
+
+
+def seconds_since(start: float) -> Duration:
+    return to_duration(seconds=time.perf_counter() - start)
+
+
 @define
 class SolveResult(BaseModel):
     """
@@ -275,6 +324,7 @@ class SolveResult(BaseModel):
     """
 
     name: str = str_field()
+    solver_id: str = str_field()
     model_string: str = str_field()
     model_file: str = str_field()
     data_string: str = str_field()
@@ -285,15 +335,19 @@ class SolveResult(BaseModel):
     flatten_time: Duration = duration_field()
     start_time: DateTime = datetime_field()
     end_time: DateTime = datetime_field()
-    statistics: Statistics = field(factory=Statistics)
+    statistics: Statistics = field(factory=Statistics, converter=to_statistics)
     iteration: int = int_field()
     objective: Optional[int] = optional(int_field())
     objective_bound: Optional[int] = optional(int_field())
     absolute_gap: Optional[int] = optional(int_field())
-    relative_gap: Optional[float] = optional(int_field())
+    relative_gap: Optional[float] = optional(float_field())
     absolute_delta: Optional[int] = optional(int_field())
-    relative_delta: Optional[float] = optional(int_field())
-    variables: Dict[str, Any] = dict_field()
+    relative_delta: Optional[float] = optional(float_field())
+    variables: Mapping[str, Any] = dict_field()
+    # Time spent in each phase of the solve so far
+    timings: Timings = field(factory=Timings)
+    # Time spent in each phase since the previous result
+    solution_timings: Timings = field(factory=Timings)
 
     @property
     def solve_time(self) -> Interval:
@@ -323,17 +377,46 @@ class SolveResult(BaseModel):
         result.get_value('a')
         result.get_value('an_array', 1)
         result.get_value('a_2d_array', 4, 10)
+
+        Values held as NumPy arrays (see `SolveOptions.numpy_arrays`)
+        also support slices and fancy indexing
+
+        result.get_value('a_2d_array', slice(None), 3)
+        result.get_value('a_2d_array', [0, 2, 4])
         """
 
         if name not in self.variables:
             raise KeyError(f'Solution does not contain a value for "{name}"')
 
         value = self.variables[name]
+
+        if np is not None and isinstance(value, np.ndarray):
+            return value[indices] if indices else value
+
         for i in indices:
             value = value[i]
 
         return value
 
+    def array(self, name, dtype=None) -> "np.ndarray":
+        """
+        Get the solution value for the given name as a
+        read-only NumPy array
+
+        result.array('x').sum(axis=1)
+        """
+        np = require_numpy()
+        value = np.asarray(self.get_value(name), dtype=dtype)
+        value.flags.writeable = False
+        return value
+
+    def arrays(self, *names, dtype=None) -> Dict[str, "np.ndarray"]:
+        """
+        Get the solution values for the given names
+        (or all variables) as read-only NumPy arrays
+        """
+        return {name: self.array(name, dtype) for name in (names or self.variables)}
+
     def get_int(self, name, *indices) -> int:
         return self.get_value(name, *indices)
 
@@ -341,6 +424,8 @@ class SolveResult(BaseModel):
         return self.get_value(name, *indices)
 
     def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.get_value(key)
         name = key[0]
         indices = key[1:]
         return self.get_value(name, *indices)
@@ -359,6 +444,411 @@ class SolveOptions(BaseModel):
     time_limit: Duration = duration_field(default=dict(minutes=1))
     flatten_options: FlattenOption = enum_field(FlattenOption.SINGLE_PASS)
     free_search: bool = bool_field(default=True)
+    variable_choice: Optional[VariableChoice] = optional(enum_field(VariableChoice.INPUT_ORDER), default=None)
+    constrain_choice: Optional[ConstrainChoice] = optional(enum_field(ConstrainChoice.INDOMAIN_MIN), default=None)
+    numpy_arrays: bool = bool_field(default=False)
+    min_interval: Duration = duration_field()
+    min_absolute_improvement: int = int_field()
+    min_relative_improvement: float = float_field()
+    stop_relative_gap: Optional[float] = optional(float_field(), default=None)
+    stop_objective: Optional[int] = optional(int_field(), default=None)
+    stop_stall_solutions: int = int_field()
+    stop_stall_time: Duration = duration_field()
+    priority: int = int_field()
+    bulk_data: bool = bool_field()
+    debug_mode: DebugMode = enum_field(DebugMode.OFF)
+    debug_sample_rate: float = float_field(default=0.01)
+    debug_max_files: int = int_field(default=100)
+    debug_max_bytes: int = int_field(default=64 * MEGABYTE)
+
+
+def freeze(value: Any, arrays: bool = False) -> Any:
+    """
+    Convert a solution value into an immutable form that
+    can be safely shared between solutions
+
+    freeze([[1, 2], [3, 4]]) == ((1, 2), (3, 4))
+    freeze({1, 2}) == frozenset({1, 2})
+
+    If `arrays` is set, numeric arrays are converted to
+    read-only NumPy arrays instead
+
+    freeze([[1, 2], [3, 4]], arrays=True) == np.array([[1, 2], [3, 4]])
+    """
+    if arrays and isinstance(value, list):
+        np = require_numpy()
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            array = None
+        if array is not None and array.dtype != object:
+            array.flags.writeable = False
+            return array
+
+    if isinstance(value, list):
+        if value and isinstance(value[0], (list, set)):
+            return tuple(freeze(v) for v in value)
+        return tuple(value)
+
+    if isinstance(value, set):
+        return frozenset(value)
+
+    return value
+
+
+_missing = object()
+
+
+def is_same(a: Any, b: Any) -> bool:
+    """
+    Are the two solution values equal?
+    """
+    if np is not None and (isinstance(a, np.ndarray) or isinstance(b, np.ndarray)):
+        return (
+            isinstance(a, np.ndarray)
+            and isinstance(b, np.ndarray)
+            and np.array_equal(a, b)
+        )
+    return a == b
+
+
+def snapshot(
+    previous: Mapping[str, Any], values: Dict[str, Any], arrays: bool = False
+) -> Mapping[str, Any]:
+    """
+    Create the immutable variables of a new solution.
+
+    Values that are unchanged from the previous solution are
+    shared with it rather than copied, so an improving solution
+    only pays for the output variables that actually changed.
+    """
+    variables = dict(previous)
+
+    for name, value in values.items():
+        value = freeze(value, arrays)
+        if not is_same(previous.get(name, _missing), value):
+            variables[name] = value
+
+    return MappingProxyType(variables)
+
+
+def thaw(value: Any) -> Any:
+    """
+    The JSON form of a frozen solution value, the
+    inverse of `freeze` (NumPy arrays are left as is)
+    """
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    if isinstance(value, frozenset):
+        return set(value)
+    return value
+
+
+def to_cached(result: SolveResult) -> Dict[str, Any]:
+    """
+    A result as stored in the ResultCache, its variables are
+    encoded as MiniZinc JSON so that sets survive the round trip
+    """
+    payload = result.to_dict()
+    variables = {name: thaw(value) for name, value in result.variables.items()}
+    payload["variables"] = json.loads(json.dumps(variables, cls=MZNJSONEncoder))
+    return payload
+
+
+def from_cached(payload: Dict[str, Any], arrays: bool = False) -> SolveResult:
+    """
+    A result read from the ResultCache, its variables are
+    frozen the same way as those of a fresh solve
+    """
+    variables = json.loads(json.dumps(payload.pop("variables", {})), cls=MZNJSONDecoder)
+    result = SolveResult.from_dict(payload)
+    result.variables = snapshot({}, variables, arrays)
+    return result
+
+
+def objective_gaps(
+    objective: Any, bound: Any
+) -> Tuple[Optional[int], Optional[int], Optional[int], Optional[float]]:
+    """
+    The objective and (finite) bound of a solution as
+    integers with the absolute and relative gap between them
+    """
+    objective = int(objective) if objective is not None else None
+    bound = int(bound) if bound is not None and math.isfinite(bound) else None
+    abs_gap: Optional[int] = None
+    rel_gap: Optional[float] = None
+    if objective is not None and bound is not None:
+        abs_gap = abs(objective - bound)
+    if abs_gap is not None and bound:
+        rel_gap = abs_gap / abs(bound)
+    return objective, bound, abs_gap, rel_gap
+
+
+async def checked(
+    results: AsyncIterable[MzResult], stopper: Stopper, method: Method
+) -> AsyncIterable[MzResult]:
+    """
+    Check every solution against the stop conditions
+    before any are held back or dropped by `coalesce`
+    """
+    async for mz_result in results:
+        if mz_result.solution is not None:
+            objective, bound, _, rel_gap = objective_gaps(
+                mz_result.objective, mz_result.statistics.get("objectiveBound")
+            )
+            stopper.check(
+                SolveResult(method=method, objective=objective, objective_bound=bound, relative_gap=rel_gap)
+            )
+        yield mz_result
+
+
+async def coalesce(
+    results: AsyncIterable[MzResult], options: SolveOptions
+) -> AsyncIterable[MzResult]:
+    """
+    Hold back intermediate solutions that arrive less than
+    `options.min_interval` after the last one delivered and drop
+    those that do not improve its objective by at least the
+    absolute and relative thresholds.
+
+    A solution held back only by the interval is delivered once
+    the interval has passed if no newer solution replaced it,
+    and the latest dropped solution is always delivered before
+    the final status so the best solution is never lost.
+    """
+    interval = options.min_interval.total_seconds()
+    min_abs = options.min_absolute_improvement
+    min_rel = options.min_relative_improvement
+
+    if not (interval or min_abs or min_rel):
+        async for mz_result in results:
+            yield mz_result
+        return
+
+    iterator = aiter(results)
+    arrival: Optional[asyncio.Future] = None
+    pending: Optional[MzResult] = None
+    # The time the pending solution is due, None if it did not improve enough
+    due: Optional[float] = None
+    last_time = -math.inf
+    last_objective: Optional[float] = None
+
+    try:
+        while True:
+            if arrival is None:
+                arrival = asyncio.ensure_future(anext(iterator, None))
+            timeout = None if due is None else max(0.0, due - time.monotonic())
+            done, _ = await asyncio.wait([arrival], timeout=timeout)
+
+            # The interval has passed without a newer solution
+            if not done:
+                assert pending is not None
+                last_time = time.monotonic()
+                last_objective = pending.objective
+                yield pending
+                pending = due = None
+                continue
+
+            mz_result = arrival.result()
+            arrival = None
+            if mz_result is None:
+                break
+
+            if mz_result.solution is None or mz_result.status == MzStatus.OPTIMAL_SOLUTION:
+                if pending is not None:
+                    yield pending
+                    pending = due = None
+                yield mz_result
+                continue
+
+            t = time.monotonic()
+            objective = mz_result.objective
+            improves = True
+
+            if last_objective is not None and objective is not None:
+                delta = abs(objective - last_objective)
+                improves = delta >= min_abs
+                if improves and min_rel and last_objective:
+                    improves = delta / abs(last_objective) >= min_rel
+
+            if not improves or t - last_time < interval:
+                if pending is not None:
+                    mz_result.statistics = pending.statistics | mz_result.statistics
+                pending = mz_result
+                due = last_time + interval if improves else None
+                continue
+
+            pending = due = None
+            last_time = t
+            last_objective = objective
+            yield mz_result
+    finally:
+        if arrival is not None:
+            arrival.cancel()
+
+    if pending is not None:
+        yield pending
+
+
+@define(frozen=True)
+class Interface:
+    """
+    The analysed interface of a MiniZinc model
+    """
+
+    method: Method
+    input: Dict[str, Any]
+    output: Dict[str, Any]
+    has_output_item: bool
+    field_renames: List[Tuple[str, str]]
+    output_type: Any
+
+    @classmethod
+    def of(cls, instance: Instance) -> "Interface":
+        """
+        Get the interface of the instance, analysing it if required
+        """
+        return cls(
+            method=instance.method,
+            input=instance.input,
+            output=instance.output,
+            has_output_item=instance.has_output_item,
+            field_renames=instance._field_renames,
+            output_type=instance.output_type,
+        )
+
+    def apply(self, instance: Instance):
+        """
+        Assign this interface to the instance so that
+        MiniZinc does not need to analyse it
+        """
+        instance._method_cache = self.method
+        instance._input_cache = dict(self.input)
+        instance._output_cache = dict(self.output)
+        instance._has_output_item_cache = self.has_output_item
+        instance._field_renames = list(self.field_renames)
+        instance.output_type = self.output_type
+
+
+# Model interfaces shared by all solves in this process
+interfaces = InterfaceCache()
+
+
+def interface_key(model: str, solver: Solver, parameters: Dict[str, Any] | None) -> str:
+    """
+    The key of a model interface, parameter values only change
+    the interface through their types so only those are hashed
+    """
+    types = sorted(
+        (name, value.__name__ if isinstance(value, EnumMeta) else type(value).__name__)
+        for name, value in (parameters or {}).items()
+    )
+    return hash_key(model, solver.id, solver.version, types)
+
+
+def copy_interface(source: Instance, target: Instance):
+    """
+    Copy the analysed model interface (method, inputs and outputs)
+    of one Instance to another so that MiniZinc does not need to
+    analyse the target again
+    """
+    Interface.of(source).apply(target)
+    target._enum_map = source._enum_map
+    target._checker = source._checker
+
+
+def compile_flatzinc(
+    instance: Instance, solver: Solver, options: SolveOptions, cache: FlatZincCache
+) -> Tuple[List[Path], Duration]:
+    """
+    Compile the instance to FlatZinc through the given cache,
+    returning the '.fzn' and '.ozn' files and the time
+    spent flattening (zero if the cache was hit)
+    """
+    with instance.files() as files:
+        key = hash_files(
+            files,
+            solver.id,
+            solver.version,
+            options.flatten_options.name,
+            instance.has_output_item,
+        )
+
+    if (cached := cache.get(key)) is not None:
+        log.debug("FlatZinc cache hit for %s", key)
+        return cached, to_duration()
+
+    flags = {
+        "output-mode": "json",
+        "output-objective": True,
+        "output-output-item": instance.has_output_item,
+    }
+
+    with instance.flat(
+        optimisation_level=options.flatten_options.value, **flags
+    ) as (fzn, ozn, statistics):
+        cached = cache.put(key, [Path(fzn.name), Path(ozn.name)])
+
+    log.debug("FlatZinc cache miss for %s", key)
+    return cached, to_duration(statistics.get("flatTime"))
+
+
+def record_result(telemetry: Telemetry, result: SolveResult, solutions: int):
+    """
+    Record the metrics and event of a final result
+    and the number of solutions found on the way
+    """
+    seconds = result.solve_time.total_seconds()
+    telemetry.count("solves")
+    telemetry.count(f"status.{result.status.name}")
+    telemetry.observe("flatten_time", result.flatten_time.total_seconds())
+    telemetry.observe("solve_time", seconds)
+    telemetry.observe("nodes", result.statistics.get("nodes"))
+    telemetry.observe("failures", result.statistics.get("failures"))
+    if seconds > 0:
+        telemetry.observe("solutions_per_second", solutions / seconds)
+
+    if telemetry.enabled:
+        telemetry.emit(
+            "result",
+            name=result.name,
+            solver_id=result.solver_id,
+            status=result.status.name,
+            objective=result.objective,
+            solutions=solutions,
+            elapsed=seconds,
+            flatten_time=result.flatten_time.total_seconds(),
+        )
+
+
+async def record_flattening(
+    history: FlattenHistory, structure: str, options: SolveOptions, result: SolveResult
+):
+    """
+    Record the flatten and solve times of a finished solve
+    against its flatten level, saving the history off the
+    event loop
+    """
+    flatten = result.timings.flatten.total_seconds()
+    solve = (result.timings.init + result.timings.search).total_seconds()
+    reached = (
+        result.status.is_proven
+        or result.status == Status.THRESHOLD
+        or (result.method == Method.SATISFY and result.has_solution)
+    )
+    cost = run_cost(flatten + solve, reached, options.time_limit.total_seconds(), result.relative_gap)
+    await asyncio.to_thread(history.record, structure, options.flatten_options, flatten, solve, cost)
+
+
+def tuned_options(options: SolveOptions, family: str, tuning_cache: TuningCache) -> SolveOptions:
+    """
+    The options with the tuned settings of the
+    model family applied, if it has been tuned
+    """
+    if (settings := tuning_cache.load(family)) is None:
+        return options
+    log.debug('"%s" using tuned settings %s', family, settings)
+    return SolveOptions.from_dict(options.to_dict() | settings)
 
 
 async def solve(
@@ -367,209 +857,685 @@ async def solve(
     name: str = "model",
     debug_path: Path | str | None = None,
     parameters: None | Dict[str, Any] = None,
+    flatzinc_cache: FlatZincCache | None = None,
+    warm_start: SolveResult | Mapping[str, Any] | None = None,
+    interface_cache: InterfaceCache | None = interfaces,
+    telemetry: Telemetry | None = default_telemetry,
+    trace: ConvergenceTrace | None = None,
+    stop: StopCondition | Iterable[StopCondition] | None = None,
+    scheduler: CoreScheduler | None = None,
+    tuning_cache: TuningCache | None = None,
+    family: str | None = None,
+    search: str | Iterable[str] | None = None,
+    flatten_history: FlattenHistory | None = None,
     **kwargs,
 ) -> AsyncIterable[SolveResult]:
     """
     Solve the given minizinc model.
-    """
-    from copy import deepcopy
 
+    If a `flatzinc_cache` is given the compiled FlatZinc is
+    looked up (or stored) there and solving an identical
+    instance again skips straight to the solver.
+
+    The model and data are written to `debug_path` in the
+    background according to `options.debug_mode`.
+
+    Intermediate solutions (requested with `intermediate_solutions=True`
+    or by setting stop conditions) can be throttled with the
+    `options.min_interval` and `options.min_*_improvement`
+    settings, the final result is always delivered. Solutions
+    are never throttled when enumerating `all_solutions`.
+
+    A previous result (or dict of variable values) can be given
+    as a `warm_start` hint for solvers that support it, it is
+    ignored for solvers that do not.
+
+    The model interface is looked up in `interface_cache` (shared
+    by the whole process by default) so that MiniZinc only analyses
+    each distinct model once, pass None to always analyse.
+
+    Counters, histograms and events are recorded to `telemetry`
+    (shared by the whole process by default).
+
+    The wall-clock time spent in each phase is reported on every
+    result as `timings` (in total) and `solution_timings` (since
+    the previous result).
+
+    The progress of every result yielded is recorded to the
+    given convergence `trace`.
+
+    The solve is stopped early, and its final result marked as
+    THRESHOLD, as soon as the `options.stop_*` thresholds or any
+    of the given `stop` conditions are met. Intermediate solutions
+    are requested so every solution is checked, including those
+    dropped by the throttling above.
+
+    Parameters are written to a single streamed '.json' data file
+    if `options.bulk_data` is set or any of them are NumPy arrays,
+    instead of being assigned to the Instance one by one.
+
+    If a `scheduler` is given the solve waits (in order of
+    `options.priority`) to lease its threads from the shared
+    core budget instead of using `options.threads`.
+
+    If the model `family` has been tuned (see `tune`) its
+    settings in the `tuning_cache` override the options.
+
+    The search annotations of the model are replaced by the given
+    `search` annotations (see `builder.int_search` etc) and the
+    variable and constrain choices of its int and bool searches
+    are swapped for `options.variable_choice/constrain_choice`
+    when set, without editing the model text.
+
+    If a `flatten_history` is given the flatten level is chosen
+    from the flatten and solve times of earlier runs of the same
+    model structure, and the times of this run are recorded to it.
+    """
+    clock = time.perf_counter()
+    timings = Timings()
+    if tuning_cache is not None and family is not None:
+        options = tuned_options(options, family, tuning_cache)
     solver = get_solver(options.solver_id)
-    debug_path = to_directory(debug_path or gettempdir(), create=True)
+
+    if search is not None:
+        model = replace_search(model, *([search] if isinstance(search, str) else search))
+    model = swap_search_choices(model, options.variable_choice, options.constrain_choice)
+
+    structure = ""
+    if flatten_history is not None:
+        structure = interface_key(model, solver, parameters)
+        options = evolve(options, flatten_options=FlattenOption(flatten_history.choose(structure)))
+
+    if warm_start is not None:
+        if supports_warm_start(solver):
+            if isinstance(warm_start, SolveResult):
+                warm_start = warm_start.variables
+            model = annotate_solve(model, warm_start_annotation(warm_start))
+        else:
+            log.debug('"%s" warm start ignored by solver "%s"', name, solver.id)
 
     # Initial solution
-    result = SolveResult(name=name, model_string=model, start_time=now())
+    result = SolveResult(
+        name=name, solver_id=options.solver_id, model_string=model, start_time=now()
+    )
 
     # Create the MiniZinc Instance
     instance = Instance(solver)
     instance.add_string(result.model_string)
 
-    for param, value in (parameters or {}).items():
-        instance[param] = value
+    parameters = parameters or {}
+    bulk_file = None
+    try:
+        # Large data is streamed to a single file kept until the solve ends,
+        # off the event loop so concurrent solves are not blocked
+        if options.bulk_data or is_bulk(parameters):
+            bulk_file = await asyncio.to_thread(
+                temporary_data_file, {k: v for k, v in parameters.items() if not is_enum(v)}
+            )
+            instance.add_file(bulk_file.name, parse_data=False)
+
+        # Enums are always assigned so their values can be decoded
+        for param, value in parameters.items():
+            if bulk_file is None or is_enum(value):
+                instance[param] = value
+
+        if options.debug_mode == DebugMode.ASYNC or (
+            options.debug_mode == DebugMode.SAMPLED
+            and random.random() < options.debug_sample_rate
+        ):
+            writer = get_debug_writer(
+                debug_path, options.debug_max_files, options.debug_max_bytes
+            )
+            model_file, data_file = writer.write(
+                name, result.id.hex[:8], model, parameters
+            )
+            result.model_file = str(model_file)
+            result.data_file = str(data_file or "")
+
+        timings.assembly = seconds_since(clock)
+        clock = time.perf_counter()
 
-    with instance.files() as files:
-        for file in files:
-            debug_root = to_filename(name)
-            debug_file = debug_path / f"{debug_root}_{file.name}"
-            copy(file, debug_file)
-
-            if file.suffix == ".mzn":
-                result.model_string += file.read_text()
-                result.model_file = str(debug_file)
-                file_type = "model"
-            elif file.suffix == ".json":
-                result.data_string += file.read_text()
-                result.data_file = str(debug_file)
-                file_type = "data"
-            elif file.suffix == ".dzn":
-                result.data_string += file.read_text()
-                result.data_file = str(debug_file)
-                file_type = "data"
+        if interface_cache is not None:
+            key = interface_key(model, solver, parameters)
+            if (interface := interface_cache.get(key)) is not None:
+                interface.apply(instance)
             else:
-                file_type = "???"
+                interface_cache.put(key, Interface.of(instance))
+
+        result.method = instance.method
+        result.status = Status.FEASIBLE
+        variables = {key for key in (instance.output or {}).keys() if key != "_checker"}
+        optimisation_level: Optional[int] = options.flatten_options.value
+        timings.analysis = seconds_since(clock)
+        clock = time.perf_counter()
+
+        if flatzinc_cache is not None:
+            (fzn_file, ozn_file), result.flatten_time = await asyncio.to_thread(
+                compile_flatzinc, instance, solver, options, flatzinc_cache
+            )
+            flat_instance = Instance(solver)
+            flat_instance.add_file(fzn_file, parse_data=False)
+            copy_interface(instance, flat_instance)
+            instance = flat_instance
+            optimisation_level = None
+            kwargs = kwargs | {"ozn-file": str(ozn_file)}
+            timings.flatten = seconds_since(clock)
+
+        conditions = stop_conditions(
+            relative_gap=options.stop_relative_gap,
+            objective=options.stop_objective,
+            stall_solutions=options.stop_stall_solutions,
+            stall_time=options.stop_stall_time,
+        )
+        if isinstance(stop, StopCondition):
+            conditions.append(stop)
+        elif stop is not None:
+            conditions.extend(stop)
+
+        # Stop conditions are checked against every solution found
+        if conditions:
+            kwargs = dict(intermediate_solutions=True) | kwargs
+
+        parallel = "-p" in solver.stdFlags
+        threads = options.threads
+        lease = None
+        if scheduler is not None:
+            lease = await scheduler.acquire(parallel, options.priority)
+            threads = lease.threads
+            log.debug('"%s" leased %d threads', name, threads)
+
+        results = instance.solutions(
+            time_limit=options.time_limit,
+            optimisation_level=optimisation_level,
+            free_search="-f" in solver.stdFlags and options.free_search,
+            processes=parallel and threads,
+            **kwargs,
+        )
 
-            log.info(f'"{name}" {file_type} written to {debug_file}')
+        if lease is not None:
+            results = leased(results, lease)
 
-    result.method = instance.method
-    result.status = Status.FEASIBLE
-    variables = {key for key in (instance.output or {}).keys() if key != "_checker"}
-    previous = result
-    mz_result: MzResult
-    
-    async for mz_result in instance.solutions(
-        time_limit=options.time_limit,
-        optimisation_level=options.flatten_options.value,
-        free_search="-f" in solver.stdFlags and options.free_search,
-        processes="-p" in solver.stdFlags and options.threads,
-        **kwargs,
-    ):
-        statistics = previous.statistics.copy()
-        statistics.update(mz_result.statistics)  # type:ignore
-
-        result = SolveResult(
-            name=name,
-            iteration=previous.iteration + 1,
-            start_time=previous.start_time,
-            end_time=now(),
-            statistics=statistics,
-            flatten_time=previous.flatten_time,
-            method=previous.method,
-            model_string=previous.model_string,
-            model_file=previous.model_file,
-            status=Status.FEASIBLE,
-            variables=deepcopy(previous.variables),
+        stopper: Optional[Stopper] = None
+        if conditions:
+            stopper = Stopper(conditions)
+            results = checked(stopper.run(results), stopper, result.method)
+
+        # Otherwise the only result is final and carries the solution
+        multiple = bool(
+            kwargs.get("all_solutions")
+            or kwargs.get("intermediate_solutions")
+            or kwargs.get("nr_solutions") is not None
         )
 
-        if "flatTime" in statistics:
-            flat_time = statistics.pop("flatTime")
-            result.flatten_time = to_duration(flat_time)
+        result.timings = result.solution_timings = timings
+        previous = result
+        finished = False
+        solutions = 0
+        mz_result: MzResult
+        clock = time.perf_counter()
+
+        # Every solution of an enumeration is delivered
+        if not kwargs.get("all_solutions"):
+            results = coalesce(results, options)
+
+        async for mz_result in results:
+            solution_timings = Timings(search=seconds_since(clock))
+            extraction_clock = time.perf_counter()
+            bound = mz_result.statistics.pop("objectiveBound", None)
+            statistics = previous.statistics.updated(mz_result.statistics)
+
+            result = SolveResult(
+                name=name,
+                solver_id=previous.solver_id,
+                iteration=previous.iteration + 1,
+                start_time=previous.start_time,
+                end_time=now(),
+                statistics=statistics,
+                flatten_time=previous.flatten_time,
+                method=previous.method,
+                model_string=previous.model_string,
+                model_file=previous.model_file,
+                status=Status.FEASIBLE,
+                variables=previous.variables,
+            )
 
-        # No solution - MiniZinc has terminated
-        if mz_result.solution is None:
-            if mz_result.status == MzStatus.OPTIMAL_SOLUTION:
-                result.variables = previous.variables.copy()
+            if statistics.flatTime is not None:
+                result.flatten_time = to_duration(seconds=statistics.flatTime)
+
+            # Flattening and solver initialisation happen before the first result
+            if previous.iteration == 0:
+                if flatzinc_cache is None:
+                    solution_timings.flatten = result.flatten_time
+                solution_timings.init = to_duration(seconds=statistics.initTime or 0)
+                solution_timings.search = max(
+                    to_duration(),
+                    solution_timings.search - solution_timings.flatten - solution_timings.init,
+                )
+
+            # No solution - MiniZinc has terminated
+            if mz_result.solution is None:
+                # The best solution found still stands
                 result.objective = previous.objective
-                result.objective_bound = previous.objective
-                result.absolute_delta = previous.absolute_gap
-                result.relative_delta = previous.absolute_delta
-                result.absolute_gap = 0
-                result.relative_gap = 0.0
-                status = OPTIMAL
+                result.objective_bound = previous.objective_bound
+                result.absolute_gap = previous.absolute_gap
+                result.relative_gap = previous.relative_gap
 
-            elif mz_result.status == MzStatus.UNSATISFIABLE:
-                status = UNSATISFIABLE
+                if mz_result.status == MzStatus.OPTIMAL_SOLUTION:
+                    result.objective_bound = previous.objective
+                    result.absolute_gap = 0
+                    result.relative_gap = 0.0
+                    status = OPTIMAL
 
-            elif mz_result.status == MzStatus.SATISFIED:
-                status = FEASIBLE
+                elif mz_result.status == MzStatus.UNSATISFIABLE:
+                    status = UNSATISFIABLE
 
-            elif mz_result.status == MzStatus.UNBOUNDED:
-                status = UNBOUNDED
+                elif mz_result.status == MzStatus.SATISFIED:
+                    status = FEASIBLE
 
-            elif mz_result.status == MzStatus.ALL_SOLUTIONS:
-                status = ALL_SOLUTIONS
+                elif mz_result.status == MzStatus.UNBOUNDED:
+                    status = UNBOUNDED
 
-            elif mz_result.status == MzStatus.UNKNOWN:
-                if result.solve_time > options.time_limit:
-                    status = TIMEOUT
-                else:
-                    status = UNKNOWN
+                elif mz_result.status == MzStatus.ALL_SOLUTIONS:
+                    status = ALL_SOLUTIONS
 
-            else:
-                status = ERROR
+                elif mz_result.status == MzStatus.UNKNOWN:
+                    if result.solve_time > options.time_limit:
+                        status = TIMEOUT
+                    else:
+                        status = UNKNOWN
 
-            result.status = status
+                else:
+                    status = ERROR
+
+                result.status = status
+                finished = True
+
+                if telemetry is not None:
+                    record_result(telemetry, result, solutions)
+
+                log.log(
+                    logging.INFO if status.has_solution else logging.ERROR,
+                    '"%s" returned "%s" after %s',
+                    name,
+                    status.name,
+                    result.solve_time,
+                )
+                log.debug('"%s" statistics %s', name, statistics)
+                solution_timings.extraction = seconds_since(extraction_clock)
+                result.solution_timings = solution_timings
+                result.timings = previous.timings + solution_timings
+                if trace is not None:
+                    trace.record(result)
+                if flatten_history is not None:
+                    await record_flattening(flatten_history, structure, options, result)
+                yield result
+                previous = result
+                clock = time.perf_counter()
+                continue
+
+            # An intermediate solution has been given
+            abs_delta: Optional[int] = None
+            rel_delta: Optional[float] = None
+
+            # Extract objective and bound, and the gap between them
+            objective, bound, abs_gap, rel_gap = objective_gaps(mz_result.objective, bound)
+
+            # Calculate absolute delta
+            if (objective is not None) and (previous.objective is not None):
+                abs_delta = abs(objective - previous.objective)
+
+            # Calculate relative delta
+            if previous.relative_gap is not None and rel_gap is not None:
+                rel_delta = previous.relative_gap - rel_gap
+
+            # Assign to solution
+            result.objective = objective
+            result.objective_bound = bound
+            result.absolute_gap = abs_gap
+            result.relative_gap = rel_gap
+            result.absolute_delta = abs_delta
+            result.relative_delta = rel_delta
+
+            # A single final solution may already be proven optimal
+            if mz_result.status == MzStatus.OPTIMAL_SOLUTION:
+                result.status = OPTIMAL
+                result.absolute_gap = 0
+                result.relative_gap = 0.0
 
-            for key, value in statistics.items():
-                log.debug(f'"{name}" {key} = {value}')
-                
-            log.log(
-                logging.INFO if status.has_solution else logging.ERROR,
-                f'"{name}" returned "{status.name}" after {result.elapsed}',
+            # Extract solved variables
+            result.variables = snapshot(
+                previous.variables,
+                {var: mz_result[var] for var in variables},
+                arrays=options.numpy_arrays,
             )
-            continue
-
-        # An intermediate solution has been given
-        objective: Optional[int] = None
-        bound: Optional[int] = None
-        abs_gap: Optional[int] = None
-        rel_gap: Optional[float] = None
-        abs_delta: Optional[int] = None
-        rel_delta: Optional[float] = None
-
-        # Extract objective
-        if (objective := mz_result.objective) is not None:  # type:ignore
-            result.objective = int(objective)
-            objective = result.objective
-
-        # Extract objective bound
-        if (bound := statistics.pop("objectiveBound", None)) is not None:  # type:ignore
-            if math.isfinite(bound):
-                result.objective_bound = int(bound)
-                bound = result.objective_bound
-
-        # Calculate absolute gap
-        if bound is not None and objective is not None:
-            abs_gap = abs(objective - bound)
-
-        # Calculate relative gap
-        if abs_gap is not None and bound:
-            rel_gap = abs_gap / bound
-
-        # Calculate absolute delta
-        if (objective is not None) and (previous.objective is not None):
-            abs_delta = abs(objective - previous.objective)
-
-        # Calculate relative delta
-        if previous.relative_gap is not None and rel_gap is not None:
-            rel_delta = previous.relative_gap - rel_gap
-
-        # Assign to solution
-        result.objective = objective
-        result.objective_bound = bound
-        result.absolute_gap = abs_gap
-        result.relative_gap = rel_gap
-        result.absolute_delta = abs_delta
-        result.relative_delta = rel_delta
-
-        # Extract solved variables
-        for var in variables:
-            value = mz_result[var]
-            result.variables[var] = value
-
-        if rel_gap is not None:
+            solutions += 1
+            finished = not multiple
+
+            if telemetry is not None:
+                telemetry.count("solutions")
+                if telemetry.enabled:
+                    telemetry.emit(
+                        "solution",
+                        name=name,
+                        solver_id=result.solver_id,
+                        iteration=result.iteration,
+                        objective=objective,
+                        relative_gap=rel_gap,
+                        elapsed=result.solve_time.total_seconds(),
+                    )
+
             log.debug(
-                f'"{name}" solution {result.iteration} has objective {result.objective} and gap {rel_gap:.2%} after {result.elapsed}'
+                '"%s" solution %d has objective %s and gap %s after %s',
+                name,
+                result.iteration,
+                objective,
+                rel_gap,
+                result.solve_time,
             )
-        elif objective is not None:
-            log.debug(
-                f'"{name}" solution {result.iteration} has objective {result.objective} after {result.elapsed}'
+            if finished:
+                if telemetry is not None:
+                    record_result(telemetry, result, solutions)
+                log.info('"%s" returned "%s" after %s', name, result.status.name, result.solve_time)
+
+            solution_timings.extraction = seconds_since(extraction_clock)
+            result.solution_timings = solution_timings
+            result.timings = previous.timings + solution_timings
+            if trace is not None:
+                trace.record(result)
+            if finished and flatten_history is not None:
+                await record_flattening(flatten_history, structure, options, result)
+            yield result
+            previous = result
+            clock = time.perf_counter()
+
+        # The solve was stopped before MiniZinc finished
+        if stopper is not None and stopper.stopped and not (finished or previous.status.is_proven):
+            solution_timings = Timings(search=seconds_since(clock))
+            result = evolve(
+                previous,
+                id=uuid4(),
+                iteration=previous.iteration + 1,
+                end_time=now(),
+                status=THRESHOLD,
+                solution_timings=solution_timings,
+                timings=previous.timings + solution_timings,
             )
-        else:
-            log.debug(
-                f'"{name}" solution {result.iteration} found after {result.elapsed}'
+            if telemetry is not None:
+                record_result(telemetry, result, solutions)
+            if trace is not None:
+                trace.record(result)
+            if flatten_history is not None:
+                await record_flattening(flatten_history, structure, options, result)
+            log.info(
+                '"%s" stopped with "%s" after %s: %s',
+                name,
+                result.status.name,
+                result.solve_time,
+                stopper.stopped_by,
             )
+            yield result
+    finally:
+        if bulk_file is not None:
+            bulk_file.close()
+
+
+# The SolveOptions that can change which result a solve proves
+RESULT_OPTIONS = (
+    "solver_id",
+    "threads",
+    "flatten_options",
+    "free_search",
+    "variable_choice",
+    "constrain_choice",
+)
+
+
+def is_flag(value: Any) -> bool:
+    scalar = (str, int, float, bool, type(None))
+    if isinstance(value, (list, tuple)):
+        return all(isinstance(v, scalar) for v in value)
+    return isinstance(value, scalar)
 
-        for key, value in statistics.items():
-            log.debug(f'"{name}" {key} = {value}')
-        yield result
-        previous = result
-    return
 
+def result_key(model: str, options: SolveOptions, mode: str, **kwargs) -> str:
+    """
+    Create the ResultCache key for solving the model with the
+    given options, parameters and solver flags (including the
+    `search` annotations)
 
-async def solution(model: str, options: SolveOptions, **kwargs) -> SolveResult:
+    Options that only affect how long a solve runs, how its
+    results are delivered or debugged are not part of the key.
+    """
+    # Enum types are hashed by their name and members
+    parameters = json.dumps(
+        {
+            name: dict(enum=value.__name__, members=[m.name for m in value]) if is_enum(value) else value
+            for name, value in (kwargs.get("parameters") or {}).items()
+        },
+        cls=MZNJSONEncoder,
+        sort_keys=True,
+    )
+    payload = options.to_dict()
+    settings = [(name, payload[name]) for name in RESULT_OPTIONS]
+    flags = sorted(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in kwargs.items()
+        if key not in ("name", "parameters", "debug_path") and is_flag(value)
+    )
+    return hash_key(mode, model, parameters, settings, flags)
+
+
+async def solution(
+    model: str,
+    options: SolveOptions,
+    result_cache: ResultCache | None = None,
+    **kwargs,
+) -> SolveResult:
     """
     Solve the model, returning only the last (and best) solution.
 
     For intermediate solutions use the `solutions` function
+
+    If a `result_cache` is given proven results (OPTIMAL
+    or UNSATISFIABLE) are stored there and returned for
+    identical solves without starting MiniZinc.
     """
+    key = ""
+    if result_cache is not None:
+        key = result_key(model, options, "solution", **kwargs)
+        if (text := result_cache.read(key)) is not None:
+            log.info('"%s" result loaded from cache', kwargs.get("name", "model"))
+            return from_cached(json.loads(text), options.numpy_arrays)
+
     result = SolveResult()
 
     async for result in solve(model, options=options, **kwargs):
         pass
 
+    if result_cache is not None and result.status.is_proven:
+        result_cache.write(key, json.dumps(to_cached(result)))
+
     return result
 
 
+def is_better(a: SolveResult, b: SolveResult) -> bool:
+    """
+    Is result `a` a better solution than result `b`?
+    """
+    if not a.has_solution:
+        return False
+
+    if not b.has_solution:
+        return True
+
+    if a.status == OPTIMAL and b.status != OPTIMAL:
+        return True
+
+    if not a.has_objective or not b.has_objective:
+        return False
+
+    if a.method == MAXIMIZE:
+        return a.objective > b.objective  # type:ignore
+
+    return a.objective < b.objective  # type:ignore
+
+
+async def race(
+    model: str,
+    options: SolveOptions,
+    solvers: List[str] | None = None,
+    **kwargs,
+) -> SolveResult:
+    """
+    Solve the model with several solvers at once and
+    return the first proven result.
+
+    The first OPTIMAL or UNSATISFIABLE result (or the first
+    solution of a satisfaction problem) wins and the
+    remaining solver processes are cancelled immediately.
+
+    If no solver can prove its result before the time
+    limit the best solution found by any solver is returned.
+
+    result = await race(model, options, solvers=[GECODE, CHUFFED, ORTOOLS])
+    result.solver_id == "chuffed"
+    """
+    solvers = solvers or [GECODE, CHUFFED, ORTOOLS]
+    queue: asyncio.Queue[Tuple[str, SolveResult | BaseException | None]] = (
+        asyncio.Queue()
+    )
+
+    async def run(solver_id: str):
+        solver_options = evolve(options, solver_id=solver_id)
+        try:
+            async for result in solve(model, solver_options, **kwargs):
+                await queue.put((solver_id, result))
+        except Exception as e:
+            await queue.put((solver_id, e))
+        finally:
+            queue.put_nowait((solver_id, None))
+
+    tasks = [asyncio.create_task(run(solver_id)) for solver_id in solvers]
+    running = len(tasks)
+    best = SolveResult(status=UNKNOWN)
+    errors: List[BaseException] = []
+
+    try:
+        while running:
+            solver_id, item = await queue.get()
+
+            if item is None:
+                running -= 1
+                continue
+
+            if isinstance(item, BaseException):
+                log.warning('Solver "%s" failed: %s', solver_id, item)
+                errors.append(item)
+                continue
+
+            result = item
+            if result.status in [OPTIMAL, UNSATISFIABLE]:
+                best = result
+                break
+
+            if result.method == SATISFY and result.has_solution:
+                best = result
+                break
+
+            if is_better(result, best):
+                best = result
+
+            elif not best.has_solution and not result.status.is_error:
+                best = result
+
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    if best.status == UNKNOWN and errors and len(errors) == len(solvers):
+        raise errors[0]
+
+    log.info('"%s" race won by "%s" with %s', best.name, best.solver_id, best.status.name)
+    return best
+
+
+# A batch job of (model, parameters, options)
+Job = Tuple[str, Optional[Dict[str, Any]], SolveOptions]
+
+
+async def solve_many(
+    jobs: Mapping[Hashable, Job] | Iterable[Job],
+    concurrency: int | None = None,
+    **kwargs,
+) -> AsyncIterable[Tuple[Hashable, SolveResult]]:
+    """
+    Solve a batch of jobs concurrently, yielding the
+    final result of each job as soon as it completes.
+
+    Jobs can be given as a mapping from key to job or as
+    an iterable of jobs in which case the key is the index.
+    At most `concurrency` MiniZinc processes run at once,
+    defaulting to the number of cores on the machine.
+
+    A job that fails yields a result with status ERROR
+    instead of aborting the rest of the batch. Each job is
+    named by its key, after the `name` if one is given.
+
+    Pass a `scheduler` to share a budget of cores between the
+    jobs, each job then leases its threads in order of
+    `options.priority`.
+
+    async for key, result in solve_many({"ward 1": (model, params, options)}):
+        ...
+    """
+    if isinstance(jobs, Mapping):
+        items = iter(jobs.items())
+    else:
+        items = iter(enumerate(jobs))
+
+    concurrency = max(1, concurrency or os.cpu_count() or 1)
+    queue: asyncio.Queue[Tuple[Hashable, SolveResult] | None] = asyncio.Queue()
+
+    async def worker():
+        try:
+            for key, (model, parameters, options) in items:
+                name = f"{kwargs['name']} {key}" if "name" in kwargs else str(key)
+                try:
+                    result = await solution(
+                        model,
+                        options=options,
+                        parameters=parameters,
+                        **(kwargs | dict(name=name)),
+                    )
+                except Exception as e:
+                    log.error('"%s" failed: %s', name, e)
+                    result = SolveResult(
+                        name=name,
+                        solver_id=options.solver_id,
+                        status=ERROR,
+                        error=str(e),
+                    )
+                await queue.put((key, result))
+        finally:
+            queue.put_nowait(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    running = len(workers)
+
+    try:
+        while running:
+            item = await queue.get()
+            if item is None:
+                running -= 1
+                continue
+            yield item
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
 async def satisfy(
     model: str, options: SolveOptions, parameters=None, **kwargs
 ) -> SolveResult:
@@ -584,18 +1550,43 @@ async def satisfy(
 
 
 async def all_solutions(
-    model: str, options: SolveOptions, parameters=None, **kwargs
+    model: str,
+    options: SolveOptions,
+    parameters=None,
+    result_cache: ResultCache | None = None,
+    **kwargs,
 ) -> Tuple[List[SolveResult], SolveResult]:
     """
     Solve the model returning all satisfactory solutions
+
+    If a `result_cache` is given a completed enumeration
+    (ALL_SOLUTIONS or UNSATISFIABLE) is stored there and
+    returned for identical solves without starting MiniZinc.
+
+    Every solution is held in memory, use `stream_solutions`
+    for large enumerations.
     """
     last_result = SolveResult()
     solutions = []
     kwargs = kwargs | dict(all_solutions=True)
 
+    key = ""
+    if result_cache is not None:
+        key = result_key(
+            model, options, "all_solutions", parameters=parameters, **kwargs
+        )
+        if (text := result_cache.read(key)) is not None:
+            log.info('"%s" solutions loaded from cache', kwargs.get("name", "model"))
+            solutions = [from_cached(d, options.numpy_arrays) for d in json.loads(text)]
+            return solutions[:-1], solutions[-1]
+
     async for result in solve(model, options=options, parameters=parameters, **kwargs):
         solutions.append(result)
 
     last_result = solutions[-1]
+
+    if result_cache is not None and last_result.status.is_proven:
+        result_cache.write(key, json.dumps([to_cached(s) for s in solutions]))
+
     solutions = solutions[:-1]
     return solutions, last_result
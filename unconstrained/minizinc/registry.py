@@ -0,0 +1,148 @@
+"""
+Process-wide registry of the MiniZinc driver and solvers
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+from dataclasses import asdict
+from tempfile import gettempdir
+from threading import Lock
+import json
+import logging
+import os
+
+import minizinc
+from minizinc import Driver, Solver
+
+log = logging.getLogger(__name__)
+
+
+class SolverRegistry:
+    """
+    The MiniZinc driver and its installed solvers.
+
+    Solvers are discovered once (with 'minizinc --solvers-json')
+    and persisted to a small JSON file keyed by the path and
+    modification time of the driver executable, so later
+    processes can skip discovery entirely until MiniZinc
+    is reinstalled or `refresh` is called.
+    """
+
+    def __init__(self, path: Path | str | None = None):
+        self.path = Path(path or Path(gettempdir()) / "unconstrained" / "solvers.json")
+        self.lock = Lock()
+        self._driver: Optional[Driver] = None
+        self._solvers: Optional[Dict[str, List[Solver]]] = None
+
+    @property
+    def driver(self) -> Driver:
+        """
+        The MiniZinc driver, throws an exception
+        if MiniZinc is not installed
+        """
+        if self._driver is None:
+            self._driver = minizinc.default_driver or Driver.find()
+        if self._driver is None:
+            raise Exception("MiniZinc is not installed")
+        return self._driver
+
+    @property
+    def solvers(self) -> Dict[str, List[Solver]]:
+        """
+        The installed solvers by id and tag
+        """
+        if self._solvers is None:
+            with self.lock:
+                if self._solvers is None:
+                    self._solvers = self.load() or self.discover()
+                    # Share the solvers with the driver so that
+                    # `Solver.lookup` does not rediscover them
+                    self.driver._solver_cache = self._solvers
+        return self._solvers
+
+    def lookup(self, tag: str) -> Solver:
+        """
+        Find the installed solver with the given id or tag
+        """
+        solvers = self.solvers.get(tag)
+        if not solvers:
+            raise LookupError(
+                f"No solver id or tag '{tag}' found, available options: {sorted(self.solvers)}"
+            )
+        return solvers[0]
+
+    def refresh(self) -> Dict[str, List[Solver]]:
+        """
+        Discover the installed solvers again
+        """
+        with self.lock:
+            self._solvers = self.discover()
+            self.driver._solver_cache = self._solvers
+        return self._solvers
+
+    def fingerprint(self) -> Dict[str, str | float]:
+        executable = self.driver.executable
+        return dict(executable=str(executable), mtime=os.stat(executable).st_mtime)
+
+    def discover(self) -> Dict[str, List[Solver]]:
+        """
+        Discover the installed solvers with MiniZinc
+        and persist them to disk
+        """
+        solvers = self.driver.available_solvers(refresh=True)
+
+        unique = list({id(s): s for tag_solvers in solvers.values() for s in tag_solvers}.values())
+        index = {id(s): i for i, s in enumerate(unique)}
+        log.debug("Discovered %d MiniZinc solvers", len(unique))
+
+        payload = dict(
+            **self.fingerprint(),
+            solvers=[asdict(s) | dict(_identifier=s._identifier) for s in unique],
+            tags={tag: [index[id(s)] for s in tag_solvers] for tag, tag_solvers in solvers.items()},
+        )
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+            temp.write_text(json.dumps(payload))
+            os.replace(temp, self.path)
+        except OSError as e:
+            log.warning("Could not persist solvers to %s: %s", self.path, e)
+
+        return solvers
+
+    def load(self) -> Optional[Dict[str, List[Solver]]]:
+        """
+        Load the persisted solvers if they were discovered
+        with the current MiniZinc executable
+        """
+        try:
+            payload = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return None
+
+        fingerprint = self.fingerprint()
+        if any(payload.get(k) != v for k, v in fingerprint.items()):
+            log.debug("Persisted solvers at %s are out of date", self.path)
+            return None
+
+        unique = []
+        for data in payload["solvers"]:
+            identifier = data.pop("_identifier", None)
+            data["extraFlags"] = [tuple(flag) for flag in data.get("extraFlags", [])]
+            solver = Solver(**data)
+            solver._identifier = identifier
+            unique.append(solver)
+
+        log.debug("Loaded %d MiniZinc solvers from %s", len(unique), self.path)
+        return {tag: [unique[i] for i in indices] for tag, indices in payload["tags"].items()}
+
+    def __str__(self):
+        return f"SolverRegistry at {self.path}"
+
+    def __repr__(self):
+        return f"<{self!s}>"
+
+
+# The process-wide solver registry
+registry = SolverRegistry()
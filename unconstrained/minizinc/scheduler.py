@@ -0,0 +1,170 @@
+"""
+Sharing a budget of cores between concurrent solves
+"""
+
+from typing import Any, AsyncIterable, AsyncIterator, List, Tuple
+from contextlib import asynccontextmanager
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+
+log = logging.getLogger(__name__)
+
+
+class Lease:
+    """
+    A number of cores leased to a single solve
+    """
+
+    def __init__(self, scheduler: "CoreScheduler", threads: int):
+        self.scheduler = scheduler
+        self.threads = threads
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.scheduler.release(self)
+
+    def __str__(self):
+        return f"Lease of {self.threads} cores"
+
+    def __repr__(self):
+        return f"<{self!s}>"
+
+
+class CoreScheduler:
+    """
+    Owns a budget of `cores` and leases threads to solves.
+
+    A solve leases the budget divided by the number of
+    solves running or waiting (between `min_threads` and
+    `max_threads`) so a lone solve gets the whole machine
+    while a busy queue runs many single threaded solves.
+
+    Solves that do not support parallel search lease a
+    single core. When the budget is exhausted solves wait
+    and are granted cores in order of priority (highest
+    first) then arrival.
+
+    Leases are granted on the next turn of the event loop
+    so that solves started together share the cores evenly
+    rather than the first taking them all.
+    """
+
+    def __init__(
+        self,
+        cores: int | None = None,
+        min_threads: int = 1,
+        max_threads: int | None = None,
+    ):
+        self.cores = max(1, cores or os.cpu_count() or 1)
+        self.min_threads = min(max(1, min_threads), self.cores)
+        self.max_threads = min(max_threads or self.cores, self.cores)
+        self.used = 0
+        self.leases = 0
+        self.waiters: List[Tuple[int, int, asyncio.Future, bool]] = []
+        self.counter = itertools.count()
+
+    @property
+    def available(self) -> int:
+        return self.cores - self.used
+
+    @property
+    def waiting(self) -> int:
+        return len(self.waiters)
+
+    def required(self, parallel: bool) -> int:
+        return self.min_threads if parallel else 1
+
+    def share(self, parallel: bool) -> int:
+        """
+        The number of threads a new lease would be granted
+        """
+        if not parallel:
+            return 1
+        demand = self.leases + len(self.waiters) + 1
+        threads = max(self.min_threads, self.cores // demand)
+        return max(1, min(threads, self.max_threads, self.available))
+
+    def grant(self, parallel: bool) -> Lease:
+        lease = Lease(self, self.share(parallel))
+        self.used += lease.threads
+        self.leases += 1
+        log.debug("Leased %d of %d cores", lease.threads, self.cores)
+        return lease
+
+    async def acquire(self, parallel: bool = True, priority: int = 0) -> Lease:
+        """
+        Lease cores for a solve, waiting until enough are free
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry = (-priority, next(self.counter), future, parallel)
+        heapq.heappush(self.waiters, entry)
+        loop.call_soon(self.wake)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                future.result().release()
+            elif entry in self.waiters:
+                self.waiters.remove(entry)
+                heapq.heapify(self.waiters)
+            raise
+
+    def release(self, lease: Lease):
+        self.used -= lease.threads
+        self.leases -= 1
+        self.wake()
+
+    def wake(self):
+        """
+        Grant cores to waiting solves in order of priority
+        """
+        while self.waiters:
+            _, _, future, parallel = self.waiters[0]
+            if future.done():
+                heapq.heappop(self.waiters)
+                continue
+            if self.available < self.required(parallel):
+                break
+            heapq.heappop(self.waiters)
+            future.set_result(self.grant(parallel))
+
+    @asynccontextmanager
+    async def lease(self, parallel: bool = True, priority: int = 0):
+        """
+        Lease cores for the duration of the context
+
+        async with scheduler.lease(priority=1) as lease:
+            options = evolve(options, threads=lease.threads)
+        """
+        lease = await self.acquire(parallel, priority)
+        try:
+            yield lease
+        finally:
+            lease.release()
+
+    def __str__(self):
+        return f"CoreScheduler using {self.used} of {self.cores} cores ({self.waiting} waiting)"
+
+    def __repr__(self):
+        return f"<{self!s}>"
+
+
+async def leased(results: AsyncIterable[Any], lease: Lease) -> AsyncIterator[Any]:
+    """
+    Iterate the results, releasing the lease once they end
+    """
+    try:
+        async for item in results:
+            yield item
+    finally:
+        lease.release()
+
+
+# The process-wide core budget
+scheduler = CoreScheduler()
@@ -0,0 +1,250 @@
+"""
+Typed solver statistics
+"""
+
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+from datetime import timedelta
+from attrs import define, evolve, field, fields
+import math
+
+from ..prelude import json_converter
+
+
+@define
+class Statistics:
+    """
+    Statistics reported by MiniZinc and the solver.
+
+    Statistics that were not reported are None and times
+    are in seconds. Statistics without a field are kept
+    in `extra`. Item access (`stats["nodes"]`, `stats.get`)
+    works as it did for the dictionaries these replace.
+    """
+
+    # Number of search nodes
+    nodes: Optional[int] = None
+    # Number of leaf nodes that were failed
+    failures: Optional[int] = None
+    # Number of times the solver restarted the search
+    restarts: Optional[int] = None
+    # Number of variables
+    variables: Optional[int] = None
+    # Number of integer variables created by the solver
+    intVariables: Optional[int] = None
+    # Number of Boolean variables created by the solver
+    boolVariables: Optional[int] = None
+    # Number of floating point variables created by the solver
+    floatVariables: Optional[int] = None
+    # Number of set variables created by the solver
+    setVariables: Optional[int] = None
+    # Number of propagators created by the solver
+    propagators: Optional[int] = None
+    # Number of propagator invocations
+    propagations: Optional[int] = None
+    # Peak depth of search tree
+    peakDepth: Optional[int] = None
+    # Number of nogoods created
+    nogoods: Optional[int] = None
+    # Number of backjumps
+    backjumps: Optional[int] = None
+    # Peak memory (in Mbytes)
+    peakMem: Optional[float] = None
+    # Initialisation time (seconds)
+    initTime: Optional[float] = None
+    # Solving time (seconds)
+    solveTime: Optional[float] = None
+    # Flattening time (seconds)
+    flatTime: Optional[float] = None
+    # Number of paths generated
+    paths: Optional[int] = None
+    # Number of Boolean variables in the flat model
+    flatBoolVars: Optional[int] = None
+    # Number of floating point variables in the flat model
+    flatFloatVars: Optional[int] = None
+    # Number of integer variables in the flat model
+    flatIntVars: Optional[int] = None
+    # Number of set variables in the flat model
+    flatSetVars: Optional[int] = None
+    # Number of Boolean constraints in the flat model
+    flatBoolConstraints: Optional[int] = None
+    # Number of floating point constraints in the flat model
+    flatFloatConstraints: Optional[int] = None
+    # Number of integer constraints in the flat model
+    flatIntConstraints: Optional[int] = None
+    # Number of set constraints in the flat model
+    flatSetConstraints: Optional[int] = None
+    # Optimisation method in the Flat Model
+    method: Optional[str] = None
+    # Number of reified constraints evaluated during flattening
+    evaluatedReifiedConstraints: Optional[int] = None
+    # Number of half-reified constraints evaluated during flattening
+    evaluatedHalfReifiedConstraints: Optional[int] = None
+    # Number of implications removed through chain compression
+    eliminatedImplications: Optional[int] = None
+    # Number of linear constraints removed through chain compression
+    eliminatedLinearConstraints: Optional[int] = None
+    # Statistics reported by the solver without a field
+    extra: Dict[str, Any] = field(factory=dict)
+
+    @classmethod
+    def from_mapping(cls, stats: Mapping[str, Any]) -> "Statistics":
+        return Statistics().updated(stats)
+
+    def updated(self, stats: Mapping[str, Any]) -> "Statistics":
+        """
+        A copy with the given (newer) statistics applied
+        """
+        changes: Dict[str, Any] = {}
+        extra = self.extra
+        for key, value in stats.items():
+            if isinstance(value, timedelta):
+                value = value.total_seconds()
+            if key in FIELD_SET:
+                changes[key] = value
+            else:
+                if extra is self.extra:
+                    extra = dict(self.extra)
+                extra[key] = value
+        return evolve(self, extra=extra, **changes)
+
+    def delta(self, previous: "Statistics") -> "Statistics":
+        """
+        The statistics since the `previous` ones, counters are
+        the difference and everything else the latest value
+        """
+        copy = self.updated({})
+        for name in COUNTERS:
+            now, before = getattr(self, name), getattr(previous, name)
+            if now is not None and before is not None:
+                setattr(copy, name, now - before)
+        return copy
+
+    def merge(self, other: "Statistics") -> "Statistics":
+        """
+        Combine the statistics of two solves, numbers are
+        summed except for peaks which take the maximum
+        """
+        copy = self.updated({})
+        for name in FIELDS:
+            a, b = getattr(self, name), getattr(other, name)
+            if b is None:
+                continue
+            if a is None or not is_number(a) or not is_number(b):
+                value = b if a is None else a
+            elif name in PEAKS:
+                value = max(a, b)
+            else:
+                value = a + b
+            setattr(copy, name, value)
+        for key, b in other.extra.items():
+            a = copy.extra.get(key)
+            copy.extra = dict(copy.extra)
+            copy.extra[key] = a + b if is_number(a) and is_number(b) else b if a is None else a
+        return copy
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in FIELD_SET:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """
+        The reported statistics
+        """
+        for name in FIELDS:
+            if (value := getattr(self, name)) is not None:
+                yield name, value
+        yield from self.extra.items()
+
+    def keys(self) -> Iterator[str]:
+        return (key for key, _ in self.items())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __getitem__(self, key: str) -> Any:
+        if (value := self.get(key)) is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.items())
+
+
+FIELDS = tuple(f.name for f in fields(Statistics) if f.name != "extra")
+FIELD_SET = frozenset(FIELDS)
+
+# Statistics that only ever grow during a solve
+COUNTERS = (
+    "nodes",
+    "failures",
+    "restarts",
+    "propagations",
+    "nogoods",
+    "backjumps",
+    "paths",
+    "solveTime",
+)
+
+# Statistics that are peaks rather than totals
+PEAKS = frozenset(["peakDepth", "peakMem"])
+
+
+def is_number(x: Any) -> bool:
+    return isinstance(x, (int, float)) and not isinstance(x, bool)
+
+
+def to_statistics(value: Statistics | Mapping[str, Any] | None) -> Statistics:
+    if isinstance(value, Statistics):
+        return value
+    return Statistics.from_mapping(value or {})
+
+
+def percentile(values: list, q: float) -> float:
+    """
+    The q'th percentile (0 <= q <= 1) of sorted values
+    """
+    if not values:
+        return math.nan
+    rank = q * (len(values) - 1)
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+def aggregate_statistics(statistics: Iterable[Statistics]) -> Dict[str, Dict[str, float]]:
+    """
+    Summarise each numeric statistic over many solves
+
+    aggregate_statistics(r.statistics for r in results)["nodes"]
+    {"count": 10, "sum": 1200, "mean": 120.0, "min": 5, "max": 400, "p50": 90.0, ...}
+    """
+    columns: Dict[str, list] = {}
+    for stats in statistics:
+        for key, value in stats.items():
+            if is_number(value):
+                columns.setdefault(key, []).append(value)
+
+    summary = {}
+    for key, values in columns.items():
+        values.sort()
+        total = sum(values)
+        summary[key] = dict(
+            count=len(values),
+            sum=total,
+            mean=total / len(values),
+            min=values[0],
+            max=values[-1],
+            p50=percentile(values, 0.5),
+            p90=percentile(values, 0.9),
+            p99=percentile(values, 0.99),
+        )
+    return summary
+
+
+json_converter.register_unstructure_hook(Statistics, Statistics.to_dict)
+json_converter.register_structure_hook(Statistics, lambda payload, _: to_statistics(payload))
@@ -0,0 +1,229 @@
+"""
+Early termination of optimisation solves
+"""
+
+from typing import TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Iterable, List, Optional
+from minizinc import Method
+from pendulum import Duration
+import asyncio
+import logging
+import time
+
+from ..prelude import to_duration
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .minizinc import SolveResult
+
+log = logging.getLogger(__name__)
+
+
+def improves(objective: Optional[float], best: Optional[float], method: Method) -> bool:
+    """
+    True if the objective is better than the best so far
+    """
+    if objective is None:
+        return False
+    if best is None:
+        return True
+    if method == Method.MINIMIZE:
+        return objective < best
+    if method == Method.MAXIMIZE:
+        return objective > best
+    return False
+
+
+class StopCondition:
+    """
+    Decides when a solve is good enough to stop.
+
+    `check` is called with every solution and returns True
+    to stop, `deadline` may return a `time.monotonic()` time
+    by which the next solution must arrive or the solve stops.
+    """
+
+    def check(self, result: "SolveResult") -> bool:
+        return False
+
+    def deadline(self) -> Optional[float]:
+        return None
+
+    def __str__(self):
+        return type(self).__name__
+
+    def __repr__(self):
+        return f"<{self!s}>"
+
+
+class RelativeGap(StopCondition):
+    """
+    Stop once the relative gap is at most `threshold`
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+
+    def check(self, result: "SolveResult") -> bool:
+        return result.relative_gap is not None and result.relative_gap <= self.threshold
+
+    def __str__(self):
+        return f"relative gap <= {self.threshold:.2%}"
+
+
+class ObjectiveTarget(StopCondition):
+    """
+    Stop once the objective reaches the `target`
+    """
+
+    def __init__(self, target: float):
+        self.target = target
+
+    def check(self, result: "SolveResult") -> bool:
+        if result.objective is None:
+            return False
+        if result.method == Method.MINIMIZE:
+            return result.objective <= self.target
+        if result.method == Method.MAXIMIZE:
+            return result.objective >= self.target
+        return False
+
+    def __str__(self):
+        return f"objective reached {self.target}"
+
+
+class NoImprovement(StopCondition):
+    """
+    Stop once `solutions` solutions in a row or `window` of
+    time have passed without the objective improving
+    """
+
+    def __init__(self, solutions: int = 0, window: Duration | dict | None = None):
+        self.solutions = solutions
+        self.window = to_duration(window).total_seconds() if window else 0.0
+        self.best: Optional[float] = None
+        self.count = 0
+        self.last_improvement: Optional[float] = None
+
+    def check(self, result: "SolveResult") -> bool:
+        if improves(result.objective, self.best, result.method):
+            self.best = result.objective
+            self.count = 0
+            self.last_improvement = time.monotonic()
+            return False
+
+        self.count += 1
+        return bool(self.solutions) and self.count >= self.solutions
+
+    def deadline(self) -> Optional[float]:
+        if not self.window or self.last_improvement is None:
+            return None
+        return self.last_improvement + self.window
+
+    def __str__(self):
+        if self.solutions:
+            return f"no improvement in {self.solutions} solutions"
+        return f"no improvement in {self.window}s"
+
+
+DONE = object()
+
+
+class Stopper:
+    """
+    Iterates the results of a MiniZinc solve from a background
+    task so the solve can be stopped as soon as any of the
+    conditions is met.
+
+    Stopping cancels the task which terminates the MiniZinc
+    process, results that had already arrived are still
+    delivered before iteration ends.
+    """
+
+    def __init__(self, conditions: Iterable[StopCondition]):
+        self.conditions: List[StopCondition] = list(conditions)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.stopped_by: Optional[StopCondition] = None
+
+    @property
+    def stopped(self) -> bool:
+        return self.stopped_by is not None
+
+    def check(self, result: "SolveResult") -> bool:
+        """
+        Check the result against each condition,
+        stopping the solve if any are met
+        """
+        if self.stopped:
+            return True
+        for condition in self.conditions:
+            if condition.check(result):
+                self.stop(condition)
+                return True
+        return False
+
+    def stop(self, condition: StopCondition):
+        log.debug('"%s" stopping the solve', condition)
+        self.stopped_by = condition
+        if self.task is not None:
+            self.task.cancel()
+
+    async def pump(self, results: AsyncIterable[Any]):
+        try:
+            async for item in results:
+                self.queue.put_nowait(item)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.queue.put_nowait(e)
+        finally:
+            self.queue.put_nowait(DONE)
+
+    async def run(self, results: AsyncIterable[Any]) -> AsyncIterator[Any]:
+        """
+        Iterate the given results until they end or
+        the solve is stopped
+        """
+        self.task = asyncio.create_task(self.pump(results))
+        try:
+            while True:
+                deadlines = [(d, c) for c in self.conditions if (d := c.deadline()) is not None]
+                if deadlines and not self.stopped:
+                    deadline, condition = min(deadlines, key=lambda x: x[0])
+                    timeout = max(0.0, deadline - time.monotonic())
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), timeout)
+                    except TimeoutError:
+                        self.stop(condition)
+                        continue
+                else:
+                    item = await self.queue.get()
+
+                if item is DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            if not self.task.done():
+                self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+
+def stop_conditions(
+    relative_gap: Optional[float] = None,
+    objective: Optional[float] = None,
+    stall_solutions: int = 0,
+    stall_time: Duration | None = None,
+) -> List[StopCondition]:
+    """
+    Create the stop conditions for the given thresholds,
+    unset thresholds are ignored
+    """
+    conditions: List[StopCondition] = []
+    if relative_gap is not None:
+        conditions.append(RelativeGap(relative_gap))
+    if objective is not None:
+        conditions.append(ObjectiveTarget(objective))
+    if stall_solutions or stall_time:
+        conditions.append(NoImprovement(stall_solutions, stall_time))
+    return conditions
@@ -0,0 +1,150 @@
+"""
+Low overhead counters, histograms and events for solves
+"""
+
+from typing import Any, Callable, Dict, List
+from array import array
+from threading import Lock
+import math
+import random
+
+Listener = Callable[[str, Dict[str, Any]], None]
+
+
+class Histogram:
+    """
+    Summary of observed values, percentiles are estimated
+    from a fixed size reservoir sample so memory stays
+    bounded however many values are observed
+    """
+
+    def __init__(self, size: int = 1024):
+        self.size = size
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.samples = array("d")
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+        elif (i := random.randrange(self.count)) < self.size:
+            self.samples[i] = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        The estimated q'th quantile (0 <= q <= 1)
+        """
+        if not self.samples:
+            return 0.0
+        samples = sorted(self.samples)
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def summary(self) -> Dict[str, float]:
+        return dict(
+            count=self.count,
+            mean=self.mean,
+            min=self.min if self.count else 0.0,
+            max=self.max if self.count else 0.0,
+            p50=self.quantile(0.5),
+            p90=self.quantile(0.9),
+            p99=self.quantile(0.99),
+        )
+
+    def __str__(self):
+        return f"Histogram of {self.count} values with mean {self.mean:.3g}"
+
+    def __repr__(self):
+        return f"<{self!s}>"
+
+
+class Telemetry:
+    """
+    Counters, histograms and structured events recorded
+    by solves.
+
+    Counters are always incremented, histogram observations
+    and events are only recorded for `sample_rate` of calls.
+    Events are only built when a listener is subscribed so
+    nothing is formatted or logged unless asked for.
+    """
+
+    def __init__(self, sample_rate: float = 1.0):
+        self.sample_rate = sample_rate
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.listeners: List[Listener] = []
+        self.lock = Lock()
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def count(self, name: str, n: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float | None):
+        if value is None or not self.sampled():
+            return
+        with self.lock:
+            if (histogram := self.histograms.get(name)) is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value)
+
+    @property
+    def enabled(self) -> bool:
+        """
+        True if any listeners are subscribed to events
+        """
+        return bool(self.listeners)
+
+    def emit(self, event: str, **fields):
+        """
+        Send the event to all listeners, callers should check
+        `enabled` first if the fields are expensive to build
+        """
+        if not self.listeners or not self.sampled():
+            return
+        for listener in self.listeners:
+            listener(event, fields)
+
+    def subscribe(self, listener: Listener) -> Listener:
+        self.listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener: Listener):
+        self.listeners.remove(listener)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        All counters and histogram summaries by name
+        """
+        with self.lock:
+            return dict(
+                counters=dict(self.counters),
+                histograms={k: h.summary() for k, h in self.histograms.items()},
+            )
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def __str__(self):
+        return f"Telemetry with {len(self.counters)} counters and {len(self.histograms)} histograms"
+
+    def __repr__(self):
+        return f"<{self!s}>"
+
+
+# The process-wide telemetry
+telemetry = Telemetry()
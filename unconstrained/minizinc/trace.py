@@ -0,0 +1,151 @@
+"""
+Compact convergence traces of optimisation solves
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+from array import array
+import csv
+import json
+import math
+
+import altair as alt
+
+from ..prelude import save_chart, to_filepath
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .minizinc import SolveResult
+
+
+def nan(value: Optional[float]) -> float:
+    return math.nan if value is None else float(value)
+
+
+def none(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class ConvergenceTrace:
+    """
+    The progress of a solve stored as one compact column
+    of doubles per measure (missing values are NaN) rather
+    than as a list of SolveResults.
+    """
+
+    columns = ("elapsed", "objective", "bound", "absolute_gap", "relative_gap", "nodes")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.elapsed = array("d")
+        self.objective = array("d")
+        self.bound = array("d")
+        self.absolute_gap = array("d")
+        self.relative_gap = array("d")
+        self.nodes = array("d")
+
+    def append(
+        self,
+        elapsed: float,
+        objective: Optional[float] = None,
+        bound: Optional[float] = None,
+        absolute_gap: Optional[float] = None,
+        relative_gap: Optional[float] = None,
+        nodes: Optional[float] = None,
+    ):
+        self.elapsed.append(elapsed)
+        self.objective.append(nan(objective))
+        self.bound.append(nan(bound))
+        self.absolute_gap.append(nan(absolute_gap))
+        self.relative_gap.append(nan(relative_gap))
+        self.nodes.append(nan(nodes))
+
+    def record(self, result: "SolveResult"):
+        """
+        Record the progress of the given result
+        """
+        self.append(
+            elapsed=result.solve_time.total_seconds(),
+            objective=result.objective,
+            bound=result.objective_bound,
+            absolute_gap=result.absolute_gap,
+            relative_gap=result.relative_gap,
+            nodes=result.statistics.get("nodes"),
+        )
+
+    def column(self, name: str) -> List[Optional[float]]:
+        return [none(v) for v in getattr(self, name)]
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        columns = [getattr(self, name) for name in self.columns]
+        for values in zip(*columns):
+            row: Dict[str, Any] = dict(label=self.label)
+            row.update((k, none(v)) for k, v in zip(self.columns, values))
+            yield row
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = dict(label=self.label)
+        payload.update((name, self.column(name)) for name in self.columns)
+        return payload
+
+    def to_json_string(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_json(self, path: Path | str) -> Path:
+        path = to_filepath(path)
+        path.write_text(self.to_json_string())
+        return path
+
+    def to_csv(self, path: Path | str) -> Path:
+        path = to_filepath(path)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.columns)
+            for row in self.rows():
+                writer.writerow("" if row[k] is None else row[k] for k in self.columns)
+        return path
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "ConvergenceTrace":
+        trace = cls(payload.get("label", ""))
+        for name in cls.columns:
+            getattr(trace, name).extend(nan(v) for v in payload.get(name, []))
+        return trace
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            len(column) * column.itemsize
+            for column in (getattr(self, name) for name in self.columns)
+        )
+
+    def __len__(self) -> int:
+        return len(self.elapsed)
+
+    def __str__(self):
+        return f"ConvergenceTrace {self.label!r} of {len(self)} solutions"
+
+    def __repr__(self):
+        return f"<{self!s}>"
+
+
+def convergence_chart(*traces: ConvergenceTrace, y: str = "objective") -> alt.Chart:
+    """
+    Chart the given measure of each trace over time
+    """
+    rows = [row for trace in traces for row in trace.rows() if row[y] is not None]
+    return (
+        alt.Chart(alt.Data(values=rows))
+        .mark_line(point=True, interpolate="step-after")
+        .encode(x=alt.X("elapsed:Q", title="Elapsed (s)"))
+        .encode(y=alt.Y(f"{y}:Q", title=y.replace("_", " ").capitalize()))
+        .encode(color=alt.Color("label:N", title="Solve"))
+    )
+
+
+def save_convergence_chart(
+    path: Path | str, *traces: ConvergenceTrace, y: str = "objective", **properties
+) -> Path:
+    """
+    Save a convergence chart of the traces to the path
+    """
+    return save_chart(convergence_chart(*traces, y=y), to_filepath(path), **properties)
@@ -0,0 +1,275 @@
+"""
+Tuning solve options over a set of instances
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+from attrs import define, field, evolve
+from pendulum import Duration
+from enum import Enum
+from itertools import product
+import logging
+import time
+
+from ..prelude import to_duration
+from .minizinc import (
+    SolveOptions,
+    SolveResult,
+    Status,
+    FlattenOption,
+    VariableChoice,
+    ConstrainChoice,
+    Method,
+    solve,
+    ERROR,
+)
+from .stopping import ObjectiveTarget
+from .cache import TuningCache
+
+log = logging.getLogger(__name__)
+
+
+class Criterion(Enum):
+    """
+    How the configurations are compared, lower scores are better
+    """
+
+    # Seconds until the solve is proven or reaches the target objective
+    TIME_TO_TARGET = "time_to_target"
+    # Relative gap when the time limit is reached
+    GAP_AT_DEADLINE = "gap_at_deadline"
+
+
+# Expose tuning criteria at top level
+TIME_TO_TARGET = Criterion.TIME_TO_TARGET
+GAP_AT_DEADLINE = Criterion.GAP_AT_DEADLINE
+
+# The SolveOptions that are tuned
+TUNED_OPTIONS = (
+    "solver_id",
+    "threads",
+    "flatten_options",
+    "free_search",
+    "variable_choice",
+    "constrain_choice",
+)
+
+# A run that never reaches the target scores this multiple of the time limit
+PENALTY = 2.0
+
+# The gap scored by a run with a solution but no bound, or no solution at all
+UNBOUNDED_GAP = 1.0
+NO_SOLUTION_GAP = 2.0
+
+
+@define
+class Trial:
+    """
+    A single run of a configuration on an instance
+    """
+
+    options: SolveOptions
+    instance: str
+    score: float
+    status: Status
+
+
+@define
+class Tuning:
+    """
+    The outcome of tuning, the configurations
+    ordered from best to worst mean score
+    """
+
+    family: str
+    criterion: Criterion
+    best: SolveOptions
+    scores: List[Tuple[SolveOptions, float]] = field(factory=list)
+    trials: List[Trial] = field(factory=list)
+
+
+def configurations(
+    base: SolveOptions,
+    solver_ids: Sequence[str] | None = None,
+    threads: Sequence[int] | None = None,
+    flatten_options: Sequence[FlattenOption] | None = None,
+    free_search: Sequence[bool] | None = None,
+    variable_choices: Sequence[VariableChoice | None] | None = None,
+    constrain_choices: Sequence[ConstrainChoice | None] | None = None,
+) -> List[SolveOptions]:
+    """
+    Every combination of the given settings, settings
+    that are not given keep their value from `base`
+
+    The search choices are swapped into the int and bool
+    search annotations of the model, None keeps its own.
+
+    configurations(options, solver_ids=["gecode", "chuffed"], variable_choices=[FIRST_FAIL, DOM_W_DEG])
+    """
+    space = product(
+        solver_ids or [base.solver_id],
+        threads or [base.threads],
+        flatten_options or [base.flatten_options],
+        free_search if free_search is not None else [base.free_search],
+        variable_choices or [base.variable_choice],
+        constrain_choices or [base.constrain_choice],
+    )
+    return [
+        evolve(
+            base,
+            solver_id=s,
+            threads=t,
+            flatten_options=f,
+            free_search=fs,
+            variable_choice=vc,
+            constrain_choice=cc,
+        )
+        for s, t, f, fs, vc, cc in space
+    ]
+
+
+def tuned_settings(options: SolveOptions) -> Dict[str, Any]:
+    """
+    The tuned settings of the options as JSON values
+    """
+    payload = options.to_dict()
+    return {name: payload[name] for name in TUNED_OPTIONS}
+
+
+def describe(options: SolveOptions) -> str:
+    return ", ".join(f"{name}={value}" for name, value in tuned_settings(options).items())
+
+
+def score(
+    result: SolveResult,
+    reached_at: Optional[float],
+    time_limit: float,
+    criterion: Criterion,
+    best: Optional[SolveResult] = None,
+) -> float:
+    """
+    The score of a run given its final `result` and
+    the `best` solution it found, lower is better
+    """
+    if criterion == Criterion.TIME_TO_TARGET:
+        return reached_at if reached_at is not None else PENALTY * time_limit
+
+    if result.status in (Status.OPTIMAL, Status.UNSATISFIABLE, Status.ALL_SOLUTIONS):
+        return 0.0
+    if best is None:
+        best = result
+    if not best.has_solution:
+        return NO_SOLUTION_GAP
+    if best.relative_gap is None:
+        return UNBOUNDED_GAP
+    return abs(best.relative_gap)
+
+
+async def trial(
+    model: str,
+    options: SolveOptions,
+    parameters: Optional[Dict[str, Any]],
+    instance: str,
+    criterion: Criterion,
+    target: float | None = None,
+    **kwargs,
+) -> Trial:
+    """
+    Run a configuration on one instance
+    """
+    time_limit = options.time_limit.total_seconds()
+    stop = ObjectiveTarget(target) if target is not None else None
+    start = time.perf_counter()
+    reached_at: Optional[float] = None
+    result = SolveResult(status=ERROR)
+    best: Optional[SolveResult] = None
+
+    try:
+        async for result in solve(
+            model, options, parameters=parameters, name=f"tune {instance}", stop=stop, **kwargs
+        ):
+            if result.has_solution:
+                best = result
+            if reached_at is not None:
+                continue
+            if (
+                result.status.is_proven
+                or (result.method == Method.SATISFY and result.has_solution)
+                or (stop is not None and stop.check(result))
+            ):
+                reached_at = time.perf_counter() - start
+    except Exception as e:
+        log.warning('Tuning "%s" with %s failed: %s', instance, describe(options), e)
+        result = SolveResult(status=ERROR, error=str(e))
+        reached_at = None
+        best = None
+
+    return Trial(
+        options=options,
+        instance=instance,
+        score=score(result, reached_at, time_limit, criterion, best),
+        status=result.status,
+    )
+
+
+async def tune(
+    model: str,
+    instances: Mapping[Hashable, Optional[Dict[str, Any]]] | Iterable[Optional[Dict[str, Any]]],
+    space: Iterable[SolveOptions],
+    family: str = "model",
+    criterion: Criterion = Criterion.TIME_TO_TARGET,
+    time_limit: Duration | dict | None = None,
+    target: float | None = None,
+    tuning_cache: TuningCache | None = None,
+    **kwargs,
+) -> Tuning:
+    """
+    Benchmark every configuration in the `space` on each of
+    the representative `instances` (parameters of the model)
+    and pick the one with the lowest mean score.
+
+    Runs are made one at a time so they do not compete for
+    cores and each is limited to `time_limit` (defaulting to
+    the configuration's own). With TIME_TO_TARGET a run that
+    never proves its result, or reaches the `target` objective,
+    scores twice the time limit.
+
+    The winner is saved for the model `family` to the given
+    `tuning_cache`, solves given the same cache and family
+    then use its settings.
+
+    space = configurations(options, solver_ids=["gecode", "chuffed"], threads=[1, 4])
+    tuning = await tune(model, weeks, space, family="rostering", tuning_cache=cache)
+    """
+    if isinstance(instances, Mapping):
+        items = [(str(key), params) for key, params in instances.items()]
+    else:
+        items = [(str(i), params) for i, params in enumerate(instances)]
+
+    kwargs.pop("name", None)
+    space = list(space)
+    if not space:
+        raise ValueError("There are no configurations to tune")
+
+    trials: List[Trial] = []
+    scores: List[Tuple[SolveOptions, float]] = []
+    for options in space:
+        if time_limit is not None:
+            options = evolve(options, time_limit=to_duration(time_limit))
+        runs = [
+            await trial(model, options, params, instance, criterion, target, **kwargs)
+            for instance, params in items
+        ]
+        trials.extend(runs)
+        mean = sum(run.score for run in runs) / max(1, len(runs))
+        log.info('"%s" scored %.3f with %s', family, mean, describe(options))
+        scores.append((options, mean))
+
+    scores.sort(key=lambda item: item[1])
+    best = scores[0][0]
+    log.info('"%s" is tuned to %s', family, describe(best))
+
+    if tuning_cache is not None:
+        tuning_cache.save(family, tuned_settings(best))
+
+    return Tuning(family=family, criterion=criterion, best=best, scores=scores, trials=trials)
+
@@ -785,6 +785,19 @@ def register_datetime():
     json_converter.register_structure_hook(DateTime, structure)
 
 
+def register_duration():
+    def unstructure(d: dt.timedelta):
+        return d.total_seconds()
+
+    def structure(payload, _):
+        return to_duration(dt.timedelta(seconds=payload))
+
+    json_converter.register_unstructure_hook(Duration, unstructure)
+    json_converter.register_structure_hook(Duration, structure)
+    json_converter.register_unstructure_hook(dt.timedelta, unstructure)
+    json_converter.register_structure_hook(dt.timedelta, structure)
+
+
 def register_uuid():
     def unstructure(id: UUID):
         return id.hex
@@ -860,6 +873,7 @@ def register_map():
 
 
 register_datetime()
+register_duration()
 register_uuid()
 register_seq()
 register_map()